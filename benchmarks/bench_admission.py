@@ -0,0 +1,153 @@
+"""
+What admission control costs per request, and what it buys under a burst.
+
+    python benchmarks/bench_admission.py --requests 20000 --burst 600
+
+``overhead`` drives admission.AdmissionMiddleware directly in front of an
+ASGI app that does nothing, with client and route limits high enough never
+to trigger, so the number is the bookkeeping alone.
+
+``burst`` sends ``--burst`` requests at once, each from its own address,
+to a handler that holds one of ``--pool`` connections for ``--query-ms``
+(a stand-in for the DB pool; a checkout waits up to ``--pool-timeout``
+seconds like DB_POOL_TIMEOUT, then fails with 503). Without admission
+control every request queues on the pool; with it, the excess is refused
+within the queue timeout. Latencies are reported separately for requests
+that were served and for those refused.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "customer-app"))
+
+from starlette.routing import Match
+
+from admission import AdmissionControl, AdmissionMiddleware, TokenBuckets
+
+
+class Route:
+    """Just enough of a Starlette route for AdmissionMiddleware"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def matches(self, scope):
+        return (Match.FULL if scope["path"] == self.path else Match.NONE), {}
+
+
+def build_app(pool=None, query_seconds=0.0, pool_timeout=30.0):
+    async def app(scope, receive, send):
+        status = 200
+        if pool is not None:
+            try:
+                await asyncio.wait_for(pool.acquire(), timeout=pool_timeout)
+                try:
+                    await asyncio.sleep(query_seconds)
+                finally:
+                    pool.release()
+            except asyncio.TimeoutError:
+                status = 503
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+async def call(app, path="/", client="10.0.0.1"):
+    """Run one request; returns (status, seconds)"""
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"host", b"bench")],
+             "query_string": b"", "client": (client, 50000)}
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - start
+
+
+async def per_request_us(app, requests, path):
+    for _ in range(min(1000, requests)):
+        await call(app, path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def overhead(args):
+    bare = build_app()
+    control = AdmissionControl(
+        max_in_flight=64, max_queue=64,
+        clients=TokenBuckets(1e9, 1e9),
+        routes={"/search": TokenBuckets(1e9, 1e9)},
+    )
+    routes = [Route(path) for path in ("/", "/search", "/user", "/export.csv")]
+    wrapped = AdmissionMiddleware(bare, control=control, routes=routes, exempt=("/health",))
+    base = await per_request_us(bare, args.requests, "/")
+    return {
+        "bare_app_us": round(base, 2),
+        "unlimited_route_us": round(await per_request_us(wrapped, args.requests, "/") - base, 2),
+        "limited_route_us": round(await per_request_us(wrapped, args.requests, "/search") - base, 2),
+        "exempt_us": round(await per_request_us(wrapped, args.requests, "/health") - base, 2),
+    }
+
+
+def summarize(results):
+    summary = {}
+    for label, statuses in (("served", {200}), ("refused", {429, 503})):
+        times = sorted(seconds for status, seconds in results if status in statuses)
+        if times:
+            summary[label] = {
+                "count": len(times),
+                "p50_ms": round(statistics.median(times) * 1000, 1),
+                "p99_ms": round(times[int(len(times) * 0.99) - 1 if len(times) > 1 else 0] * 1000, 1),
+                "max_ms": round(times[-1] * 1000, 1),
+            }
+    return summary
+
+
+async def burst(args, admit):
+    pool = asyncio.Semaphore(args.pool)
+    app = build_app(pool, args.query_ms / 1000, args.pool_timeout)
+    if admit:
+        control = AdmissionControl(
+            max_in_flight=2 * args.pool, max_queue=args.pool, queue_timeout=args.queue_timeout,
+        )
+        app = AdmissionMiddleware(app, control=control)
+    results = await asyncio.gather(*(
+        call(app, client=f"10.0.{i // 250}.{i % 250}") for i in range(args.burst)
+    ))
+    return summarize(results)
+
+
+async def main(args):
+    print(json.dumps({
+        "overhead": await overhead(args),
+        "burst": {
+            "no_admission": await burst(args, admit=False),
+            "admission": await burst(args, admit=True),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=600)
+    parser.add_argument("--pool", type=int, default=15, help="DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW")
+    parser.add_argument("--query-ms", type=float, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument("--queue-timeout", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
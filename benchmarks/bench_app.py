@@ -0,0 +1,314 @@
+"""
+Concurrent load test of the customer app across the list, detail, update,
+delete and login paths, reporting p50/p95/p99 latency and throughput.
+
+Targets, in order of realism:
+
+    # in-process over ASGI against a SQLite file from seed.py
+    python benchmarks/bench_app.py --db /tmp/customers-100k.db --duration 30 --concurrency 32
+    # the same database behind a real uvicorn server
+    python benchmarks/bench_app.py --db /tmp/customers-100k.db --uvicorn
+    # any running instance (MySQL-backed, in a container, ...)
+    python benchmarks/bench_app.py --url http://127.0.0.1:8000 --admin-password ...
+
+With no --db or --url the app is started in-process against MySQL using
+the usual DB_* environment variables. Update and delete really write, so
+point it at a scratch database and re-seed between runs.
+
+--output writes the results as JSON; --baseline compares them against an
+earlier result file and exits non-zero on a regression beyond --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import secrets
+import subprocess
+import sys
+import time
+
+import httpx
+
+from datasets import ROOT
+
+APP_DIR = os.path.join(ROOT, "customer-app")
+
+# Relative request mix; scenario -> (weight, expected status)
+SCENARIOS = {
+    "list": (40, 200),
+    "detail": (40, 200),
+    "update": (10, 303),
+    "delete": (2, 303),
+    "login": (8, 303),
+}
+# Customers reserved for the delete scenario, so reads and updates never hit a deleted row
+DELETE_RESERVE = 0.1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+class LoadGenerator:
+    def __init__(self, client, customers, admin_password, seed=0):
+        self.client = client
+        self.rng = random.Random(seed)
+        reserve = max(1, int(len(customers) * DELETE_RESERVE))
+        self.deletable = customers[-reserve:]
+        self.customers = customers[:-reserve] or customers
+        self.max_index = max(index for index, _ in self.customers)
+        self.admin_password = admin_password
+        self.latencies = {name: [] for name in SCENARIOS}
+        self.errors = {name: 0 for name in SCENARIOS}
+        self.recording = False
+
+    def request_for(self, scenario):
+        if scenario == "list":
+            after = self.rng.randrange(0, self.max_index)
+            return "GET", f"/?after={after}", {}
+        if scenario == "detail":
+            return "GET", f"/user/{self.rng.choice(self.customers)[1]}", {}
+        if scenario == "update":
+            name = self.rng.choice(["Ada", "Grace", "Alan", "Edsger", "Barbara"])
+            return "POST", f"/user/{self.rng.choice(self.customers)[1]}/update", {
+                "data": {"first_name": name, "last_name": "Bench"}
+            }
+        if scenario == "delete":
+            if not self.deletable:
+                return None
+            return "POST", f"/user/{self.deletable.pop()[1]}/delete", {}
+        return "POST", "/login", {"data": {"username": "admin", "password": self.admin_password}}
+
+    async def worker(self, deadline):
+        names = list(SCENARIOS)
+        weights = [SCENARIOS[name][0] for name in names]
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            request = self.request_for(scenario)
+            if request is None:
+                continue
+            method, path, kwargs = request
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                ok = response.status_code == SCENARIOS[scenario][1]
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if self.recording:
+                self.latencies[scenario].append(elapsed)
+                if not ok:
+                    self.errors[scenario] += 1
+
+    async def run(self, concurrency, duration, warmup):
+        if warmup:
+            await asyncio.gather(*(self.worker(time.perf_counter() + warmup) for _ in range(concurrency)))
+        self.recording = True
+        start = time.perf_counter()
+        await asyncio.gather(*(self.worker(start + duration) for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+
+        results = {name: summarize(self.latencies[name], self.errors[name], seconds) for name in SCENARIOS}
+        results["total"] = summarize(
+            [value for values in self.latencies.values() for value in values],
+            sum(self.errors.values()), seconds,
+        )
+        return results
+
+
+async def fetch_customers(client, limit):
+    """(Index, Customer Id) pairs from the JSON search API, so any target works without DB access"""
+    customers, after = [], None
+    while len(customers) < limit:
+        params = {"page_size": min(500, limit - len(customers))}
+        if after is not None:
+            params["after"] = after
+        response = await client.get("/api/v1/customers/search", params=params)
+        response.raise_for_status()
+        body = response.json()
+        customers.extend((item["Index"], item["Customer Id"]) for item in body["items"])
+        after = body["next_after"]
+        if after is None:
+            break
+    if not customers:
+        raise SystemExit("The target database has no customers; run seed.py first")
+    return customers
+
+
+def configure_app_env(args):
+    """Environment for an app started by this script; returns the admin password"""
+    from passlib.context import CryptContext
+
+    password = secrets.token_urlsafe(12)
+    env = {
+        "SESSION_SECRET": secrets.token_urlsafe(32),
+        # A real bcrypt hash so logins pay the production verification cost
+        "ADMIN_PASSWORD_HASH": CryptContext(schemes=["bcrypt"]).hash(password),
+        # Every request comes from this one client, so the per-client limits would answer
+        # most of them with 429; the in-flight cap stays on, as in production
+        "RATE_LIMIT_PER_SECOND": "0",
+        "SEARCH_RATE_PER_SECOND": "0",
+        "EXPORT_RATE_PER_SECOND": "0",
+        "LOGIN_ATTEMPTS_PER_MINUTE": "0",
+    }
+    if args.db:
+        env.update({"DB_DRIVER": "sqlite", "DB_SQLITE_PATH": args.db})
+    os.environ.update(env)
+    return password
+
+
+async def run_in_process(args, password):
+    sys.path.insert(0, APP_DIR)
+    os.chdir(APP_DIR)  # templates are loaded relative to the app directory
+    import backend
+
+    transport = httpx.ASGITransport(app=backend.app)
+    async with backend.app.router.lifespan_context(backend.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await drive(client, args, password)
+
+
+async def run_against_url(args, url, password):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        return await drive(client, args, password)
+
+
+async def drive(client, args, password):
+    customers = await fetch_customers(client, args.customers)
+    generator = LoadGenerator(client, customers, password, seed=args.seed)
+    return await generator.run(args.concurrency, args.duration, args.warmup)
+
+
+def start_uvicorn(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=APP_DIR, env=os.environ.copy(),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become healthy within 30s")
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline`` beyond ``tolerance`` (a fraction)"""
+    regressions = []
+    for key in ("target", "database", "concurrency"):
+        if baseline.get("config", {}).get(key) != results["config"][key]:
+            print(f"Warning: baseline was recorded with {key}={baseline.get('config', {}).get(key)!r}, "
+                  f"this run used {results['config'][key]!r}", file=sys.stderr)
+    for scenario, base in baseline.get("scenarios", {}).items():
+        current = results["scenarios"].get(scenario)
+        if not current or not base.get("requests"):
+            continue
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{scenario}: {current['errors']} errors (baseline {base.get('errors', 0)})")
+        for key in ("p95_ms", "p99_ms"):
+            if base.get(key) and current.get(key) and current[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{scenario}: {key} {current[key]} vs baseline {base[key]}")
+        if base.get("rps") and current.get("rps") and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: rps {current['rps']} vs baseline {base['rps']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--db", help="SQLite file seeded by seed.py; the app is started by this script")
+    target.add_argument("--url", help="Base URL of an already running instance")
+    parser.add_argument("--uvicorn", action="store_true", help="Serve the app with uvicorn instead of in-process")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD", "admin123"),
+                        help="Admin password of the --url target")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--customers", type=int, default=5000, help="Customers sampled for detail/update/delete")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown before a result counts as a regression")
+    args = parser.parse_args()
+    # The in-process target changes into the app directory; resolve paths first
+    for name in ("db", "output", "baseline"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+
+    proc = None
+    try:
+        if args.url:
+            target = "url"
+            scenarios = asyncio.run(run_against_url(args, args.url.rstrip("/"), args.admin_password))
+        else:
+            password = configure_app_env(args)
+            if args.uvicorn:
+                target = "uvicorn"
+                proc, url = start_uvicorn(args.port)
+                scenarios = asyncio.run(run_against_url(args, url, password))
+            else:
+                target = "in-process"
+                scenarios = asyncio.run(run_in_process(args, password))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    results = {
+        "config": {
+            "target": target,
+            "database": "sqlite" if args.db else "mysql",
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+        },
+        "scenarios": scenarios,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
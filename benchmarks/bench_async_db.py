@@ -0,0 +1,119 @@
+"""
+Concurrent-request throughput with blocking driver calls on the event loop
+(the old handlers) versus the AsyncDatabase executor layer.
+
+A fake connection adds a fixed per-query latency so the numbers reflect
+event-loop blocking rather than MySQL itself:
+
+    python benchmarks/bench_async_db.py --requests 400 --concurrency 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "customer-app"))
+
+import httpx
+from fastapi import FastAPI
+
+from db import AsyncDatabase, ConnectionPool, get_db_cursor
+
+
+class FakeCursor:
+    def __init__(self, latency):
+        self.latency = latency
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        time.sleep(self.latency)
+        self.rowcount = 1
+
+    def fetchone(self):
+        return {"Customer Id": "EB54EF1154C3A78", "First Name": "Heather"}
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def cursor(self, dictionary=True, buffered=True):
+        return FakeCursor(self.latency)
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def build_app(pool, database):
+    app = FastAPI()
+    sql = "SELECT * FROM customers WHERE `Customer Id` = %s"
+
+    @app.get("/blocking/{user_id}")
+    async def blocking(user_id: str):
+        with pool.connection() as conn:
+            with get_db_cursor(conn) as cursor:
+                cursor.execute(sql, (user_id,))
+                return cursor.fetchone()
+
+    @app.get("/async/{user_id}")
+    async def non_blocking(user_id: str):
+        return await database.fetch_one(sql, (user_id,))
+
+    return app
+
+
+async def drive(app, path, requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def one(i):
+            async with sem:
+                r = await client.get(f"{path}/{i}")
+                r.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return time.perf_counter() - start
+
+
+async def main(args):
+    latency = args.latency_ms / 1000
+    pool = ConnectionPool(lambda: FakeConnection(latency), pool_size=args.pool_size,
+                          max_overflow=args.max_overflow)
+    database = AsyncDatabase(pool.connection, max_workers=pool.capacity)
+    app = build_app(pool, database)
+
+    results = {}
+    for mode in ("blocking", "async"):
+        elapsed = await drive(app, f"/{mode}", args.requests, args.concurrency)
+        results[mode] = {
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(args.requests / elapsed, 1),
+        }
+    results["speedup"] = round(results["blocking"]["seconds"] / results["async"]["seconds"], 2)
+    database.close()
+    pool.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
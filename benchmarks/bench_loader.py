@@ -0,0 +1,80 @@
+"""
+Bulk-load throughput and peak memory per scripts/load_to_rds.py strategy.
+
+Each strategy runs in a fresh subprocess against an empty `customers`
+table, so peak RSS is measured per strategy. Defaults to a throwaway
+SQLite file; point --url at a scratch MySQL database to include
+load_data (the `customers` table there is dropped before every run):
+
+    python benchmarks/bench_loader.py --rows 1000000 --strategies executemany parallel
+    python benchmarks/bench_loader.py --url mysql+pymysql://root:pw@127.0.0.1/bench --rows 1000000
+
+--formats csv parquet repeats every strategy on a Parquet copy of the same
+rows (needs pyarrow) to show what skipping text parsing buys.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from datasets import ROOT, reset_database, synthetic_csv
+
+RUNNER = """
+import json, sys
+sys.path.insert(0, {scripts!r})
+from load_to_rds import RDSConnectionManager, run_load
+manager = RDSConnectionManager()
+config = manager.get_rds_config()
+engine = manager.create_engine(config, local_infile={strategy!r} == "load_data")
+print(json.dumps(run_load(engine, config, {csv!r}, {strategy!r}, {batch_size}, {workers})))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL of a scratch database")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--strategies", nargs="+", default=["to_sql", "executemany", "parallel"])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--formats", nargs="+", choices=["csv", "parquet"], default=["csv"])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_loader_")
+    url = args.url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    csv_path = synthetic_csv(args.rows, os.path.join(workdir, f"customers-{args.rows}.csv"))
+    inputs = {"csv": csv_path}
+    if "parquet" in args.formats:
+        # Converted in a child process: ru_maxrss survives exec, so doing it here would
+        # inflate every strategy's peak_rss_mb
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, "scripts", "load_to_rds.py"),
+             "--input", csv_path, "--convert-to-parquet"],
+            check=True, capture_output=True,
+        )
+        inputs["parquet"] = os.path.splitext(csv_path)[0] + ".parquet"
+
+    results = []
+    for fmt in args.formats:
+        for strategy in args.strategies:
+            reset_database(url)
+            code = RUNNER.format(
+                scripts=os.path.join(ROOT, "scripts"), csv=inputs[fmt], strategy=strategy,
+                batch_size=args.batch_size, workers=args.workers,
+            )
+            proc = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True,
+                env={**os.environ, "DATABASE_URL": url},
+            )
+            if proc.returncode != 0:
+                result = {"strategy": strategy, "error": proc.stderr.strip().splitlines()[-1]}
+            else:
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append({"format": fmt, **result})
+            print(json.dumps(results[-1]), flush=True)
+
+
+if __name__ == "__main__":
+    main()
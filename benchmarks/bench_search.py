@@ -0,0 +1,125 @@
+"""
+Search query latency against MySQL at increasing table sizes.
+
+Seeds a synthetic `customers_bench` table (rows cycled from
+customers-10000.csv with unique Index / Customer Id values) with the
+columns and indexes of scripts/schema.py, then times the queries built by
+backend.build_search_query:
+
+    python benchmarks/bench_search.py --url mysql+pymysql://root:pw@127.0.0.1/bench \
+        --sizes 10000 1000000 10000000
+
+Needs a MySQL server; FULLTEXT indexes have no SQLite equivalent.
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "customer-app"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from sqlalchemy import create_engine, text
+
+import backend
+from schema import create_customer_indexes, create_customers_table
+
+TABLE = "customers_bench"
+
+QUERIES = {
+    "last_name_prefix": {"last_name": "Sm"},
+    "country_prefix_and_date_range": {
+        "country": "Nor", "subscribed_from": date(2021, 1, 1), "subscribed_to": date(2021, 6, 30),
+    },
+    "any_name_prefix": {"q": "Ki", "mode": "prefix"},
+    "fulltext": {"q": "Kim*", "mode": "fulltext"},
+    "email_prefix": {"email": "jo"},
+}
+
+
+def seed(engine, size, batch_size=10000):
+    with open(os.path.join(ROOT, "customers-10000.csv"), newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        template_rows = list(reader)
+
+    columns = ", ".join(f"`{c}`" for c in header)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        create_customers_table(conn, TABLE)
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        sql = f"INSERT INTO {TABLE} ({columns}) VALUES ({', '.join(['%s'] * len(header))})"
+        batch = []
+        for i in range(1, size + 1):
+            row = template_rows[(i - 1) % len(template_rows)]
+            batch.append([i, f"{i:015X}"] + row[2:])
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                raw.commit()
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            raw.commit()
+    finally:
+        raw.close()
+    with engine.begin() as conn:
+        create_customer_indexes(conn, TABLE)
+
+
+def time_query(engine, filters, page_size, repeat):
+    where, params = backend.build_search_query(dict(filters))
+    sql = (
+        backend.EXPORT_SELECT_BASE.replace("FROM customers", f"FROM {TABLE}")
+        + f" WHERE {where} ORDER BY `Index` LIMIT %s"
+    )
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        timings, rows = [], 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, tuple(params + [page_size + 1]))
+            rows = len(cursor.fetchall())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            "rows": rows,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        }
+    finally:
+        raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL"), required=os.getenv("BENCH_DATABASE_URL") is None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000, 10000000])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    results = {}
+    for size in args.sizes:
+        start = time.perf_counter()
+        seed(engine, size)
+        results[size] = {"seed_seconds": round(time.perf_counter() - start, 1)}
+        for name, filters in QUERIES.items():
+            results[size][name] = time_query(engine, filters, args.page_size, args.repeat)
+        print(json.dumps({size: results[size]}, indent=2), flush=True)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Per-request cost of the session layer, measured by driving the middleware
+directly with an ASGI app that only reads ``is_admin`` (as the listing and
+detail pages do), so the numbers are the middleware alone:
+
+    starlette     starlette.middleware.sessions.SessionMiddleware (the old setup)
+    cookie        sessions.SessionMiddleware with signed-cookie tokens
+    store         sessions.SessionMiddleware with a server-side SessionStore
+
+    python benchmarks/bench_sessions.py --requests 20000
+
+Scenarios: ``anonymous`` sends no cookie, ``admin`` sends a logged-in
+cookie and leaves the session alone, ``write`` changes the session on every
+request (like pin_reads_to_primary after an edit). Overhead is the time per
+request minus that of the bare app.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "customer-app"))
+
+from starlette.middleware.sessions import SessionMiddleware as StarletteSessionMiddleware
+
+from sessions import SessionMiddleware, SessionStore, SessionTokens
+
+SECRET = "bench-secret"
+COOKIE = "secure_session"
+
+
+def build_app(write):
+    async def app(scope, receive, send):
+        session = scope.get("session")
+        is_admin = bool(session.get("is_admin", False)) if session is not None else False
+        if session is not None and (write or scope["path"] == "/login"):
+            session["is_admin"] = True
+            session["primary_reads_until"] = time.time() + 5
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"admin" if is_admin else b"anonymous"})
+    return app
+
+
+def wrap(layer, app):
+    if layer == "none":
+        return app
+    if layer == "starlette":
+        return StarletteSessionMiddleware(app, secret_key=SECRET, session_cookie=COOKIE, max_age=3600)
+    store = SessionStore(ttl=3600) if layer == "store" else None
+    return SessionMiddleware(app, tokens=SessionTokens(SECRET, max_age=3600, store=store), session_cookie=COOKIE)
+
+
+async def call(app, path, cookie=None):
+    """Run one request; returns the Set-Cookie value, if any"""
+    headers = [(b"host", b"bench")]
+    if cookie:
+        headers.append((b"cookie", f"{COOKIE}={cookie}".encode("latin-1")))
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers, "query_string": b""}
+    set_cookie = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            set_cookie.extend(v.decode("latin-1") for k, v in message["headers"] if k == b"set-cookie")
+
+    await app(scope, receive, send)
+    return set_cookie[0] if set_cookie else None
+
+
+async def per_request_us(layer, scenario, requests):
+    app = wrap(layer, build_app(write=scenario == "write"))
+    cookie = None
+    if scenario != "anonymous" and layer != "none":
+        set_cookie = await call(app, "/login")
+        cookie = set_cookie.split(";", 1)[0].split("=", 1)[1]
+    for _ in range(min(1000, requests)):
+        await call(app, "/", cookie)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, "/", cookie)
+    return (time.perf_counter() - start) / requests * 1e6, len(cookie or "")
+
+
+async def main(args):
+    results = {}
+    for scenario in ("anonymous", "admin", "write"):
+        bare, _ = await per_request_us("none", scenario, args.requests)
+        results[scenario] = {"bare_app_us": round(bare, 2)}
+        for layer in ("starlette", "cookie", "store"):
+            us, cookie_bytes = await per_request_us(layer, scenario, args.requests)
+            results[scenario][layer] = {
+                "overhead_us": round(us - bare, 2),
+                "cookie_bytes": cookie_bytes,
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
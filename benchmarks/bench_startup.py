@@ -0,0 +1,170 @@
+"""
+Cold-start cost of the customer app: where `import backend` spends its time,
+and how long a fresh server takes until /ready answers 200.
+
+    python benchmarks/bench_startup.py --db /tmp/customers.db
+    python benchmarks/bench_startup.py --db /tmp/customers.db --server gunicorn --budget 5
+
+The import profile comes from `python -X importtime`, summarized per
+top-level package (self time, so nothing is counted twice) and per module
+imported directly by backend (cumulative). Time-to-ready is measured from
+spawning the server process, so it includes interpreter start, imports,
+the lifespan hook (pool prefill, cache warm-up) and, under gunicorn, forking
+the workers. The median over --repeat runs is compared against --budget
+(seconds); a run over budget exits non-zero.
+"""
+import argparse
+import json
+import os
+import re
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from datasets import ROOT
+
+APP_DIR = os.path.join(ROOT, "customer-app")
+
+# "import time:       320 |      32054 |   mysql.connector"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_env(db):
+    env = {**os.environ, "SESSION_SECRET": secrets.token_urlsafe(32)}
+    if db:
+        env.update({"DB_DRIVER": "sqlite", "DB_SQLITE_PATH": db})
+    return env
+
+
+def import_profile(env):
+    """One `-X importtime` run of `import backend`: [(self_us, cumulative_us, depth, module)]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return entries
+
+
+def summarize_imports(entries, top):
+    backend = next(cumulative for _, cumulative, depth, module in entries if module == "backend" and depth == 0)
+    packages = {}
+    for self_us, _, _, module in entries:
+        root = module.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    # Entries are printed after their children, so backend's direct imports are the depth-1 lines
+    direct = [(cumulative, module) for _, cumulative, depth, module in entries if depth == 1]
+    return {
+        "total_ms": round(sum(self_us for self_us, *_ in entries) / 1000, 1),
+        "backend_ms": round(backend / 1000, 1),
+        "modules": len(entries),
+        "by_package_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "backend_imports_ms": {
+            module: round(us / 1000, 1) for us, module in sorted(direct, reverse=True)[:top]
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(server, port, workers):
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "backend:app", "-c", "gunicorn.conf.py",
+                "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "backend:app", "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning"]
+
+
+def time_to_ready(server, env, workers, timeout=60):
+    """Seconds from spawning the server until it listens (/health) and until /ready is 200"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(server_command(server, port, workers), cwd=APP_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    listening = None
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                if proc.poll() is not None:
+                    raise SystemExit(f"{server} exited during startup")
+                try:
+                    if listening is None and client.get(f"{url}/health").status_code == 200:
+                        listening = time.perf_counter() - start
+                    if listening is not None and client.get(f"{url}/ready").status_code == 200:
+                        return listening, time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.005)
+        raise SystemExit(f"{server} was not ready within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize_runs(seconds):
+    return {
+        "median_s": round(statistics.median(seconds), 3),
+        "min_s": round(min(seconds), 3),
+        "max_s": round(max(seconds), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite file seeded by seed.py; without it the DB_* MySQL settings are used")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts measured; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Packages and modules listed in the import profile")
+    parser.add_argument("--budget", type=float, help="Fail when the median time-to-ready exceeds this many seconds")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+    env = app_env(os.path.abspath(args.db) if args.db else None)
+
+    # The fastest run is the least disturbed by the rest of the machine
+    profiles = [import_profile(env) for _ in range(args.repeat)]
+    imports = summarize_imports(min(profiles, key=lambda entries: sum(e[0] for e in entries)), args.top)
+
+    runs = [time_to_ready(args.server, env, args.workers) for _ in range(args.repeat)]
+    results = {
+        "config": {
+            "server": args.server,
+            "workers": args.workers if args.server == "gunicorn" else 1,
+            "database": "sqlite" if args.db else "mysql",
+            "repeat": args.repeat,
+            "python": sys.version.split()[0],
+        },
+        "imports": imports,
+        "listening": summarize_runs([listening for listening, _ in runs]),
+        "ready": summarize_runs([ready for _, ready in runs]),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget is not None and results["ready"]["median_s"] > args.budget:
+        print(f"Time-to-ready {results['ready']['median_s']}s exceeds the {args.budget}s budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput of the shared row validation in customer-app/validation.py, in
+rows/sec, for the three ways rows can be checked:
+
+    legacy      re.match on an uncompiled pattern string per field, as the
+                update form did (names only, so it checks less than the others)
+    per_record  validation.validate_record, one row at a time
+    vectorized  validation.validate_frame over loader-sized chunks
+
+    python benchmarks/bench_validation.py --rows 1000000 --chunk-size 5000
+
+A fraction of rows is corrupted (--invalid) so the rejection path is timed too.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from datasets import ROOT, SOURCE_CSV, synthetic_csv
+
+sys.path.insert(0, os.path.join(ROOT, "customer-app"))
+
+import validation
+
+# Replacement values that each trip exactly one rule
+CORRUPTIONS = [
+    ("Email", "not-an-email"),
+    ("Subscription Date", "2021-02-30"),
+    ("First Name", "X"),
+    ("Phone 1", "call me"),
+    ("Customer Id", ""),
+]
+
+
+def load_rows(rows, invalid, seed, workdir=None):
+    path = SOURCE_CSV if rows == 10000 else synthetic_csv(
+        rows, os.path.join(workdir or os.path.dirname(SOURCE_CSV), f"customers-{rows}.csv")
+    )
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    rng = random.Random(seed)
+    for index in rng.sample(range(len(df)), int(len(df) * invalid)):
+        column, value = rng.choice(CORRUPTIONS)
+        df.at[index, column] = value
+    return df
+
+
+def legacy(records):
+    rejected = 0
+    for record in records:
+        for column in ("First Name", "Last Name"):
+            value = record[column].strip()
+            if len(value) < 2 or len(value) > 50 or not re.match(r"^[A-Za-z\s'-]+$", value):
+                rejected += 1
+                break
+    return rejected
+
+
+def per_record(records):
+    return sum(1 for record in records if validation.validate_record(record))
+
+
+def vectorized(df, chunk_size):
+    return sum(
+        int((validation.validate_frame(df.iloc[start:start + chunk_size]) != "").sum())
+        for start in range(0, len(df), chunk_size)
+    )
+
+
+def measure(fn, rows, repeat):
+    best, rejected = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rejected = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return {"rejected": rejected, "seconds": round(best, 4), "rows_per_sec": round(rows / best)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="10000 uses customers-10000.csv as-is")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per validate_frame call (loader --batch-size)")
+    parser.add_argument("--invalid", type=float, default=0.01, help="Fraction of rows corrupted")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Where synthetic CSVs are generated and cached")
+    args = parser.parse_args()
+
+    df = load_rows(args.rows, args.invalid, args.seed, args.workdir)
+    records = df.to_dict("records")
+    results = {
+        "config": {
+            "rows": len(df), "chunk_size": args.chunk_size, "invalid": args.invalid,
+            "pandas": pd.__version__, "python": sys.version.split()[0],
+        },
+        "legacy": measure(lambda: legacy(records), len(df), args.repeat),
+        "per_record": measure(lambda: per_record(records), len(df), args.repeat),
+        "vectorized": measure(lambda: vectorized(df, args.chunk_size), len(df), args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
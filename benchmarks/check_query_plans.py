@@ -0,0 +1,148 @@
+"""
+Check with EXPLAIN that the app's hot queries are answered from indexes.
+
+    python benchmarks/check_query_plans.py --db /tmp/customers.db
+    python benchmarks/check_query_plans.py --url mysql+pymysql://root:pw@127.0.0.1/bench
+
+Point it at a database seeded by seed.py, so scripts/schema.py has run.
+Queries are built the way customer-app/backend.py builds them, with values
+taken from a row in the middle of the table. Each must avoid a full table
+scan and use only the indexes listed for it; otherwise this exits 1.
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import create_engine
+
+from datasets import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "customer-app"))
+
+import backend
+
+PAGE_SIZE = 50
+# SQLite names the index behind a PRIMARY KEY sqlite_autoindex_<table>_N
+SQLITE_STEP = re.compile(
+    r"^(SCAN|SEARCH) customers"
+    r"(?: USING (?:COVERING )?INDEX (\S+)| USING (?:INTEGER )?PRIMARY KEY)?"
+)
+
+
+def page_query(where=None):
+    """One keyset page, as backend.fetch_customer_page runs it"""
+    sql = backend.LIST_SELECT + (f" WHERE {where}" if where else "")
+    return sql + " ORDER BY `Index` LIMIT %s"
+
+
+def hot_queries(sample):
+    """name -> (sql, params, allowed indexes, dialects or None for all)"""
+    queries = {
+        "detail": (
+            "SELECT * FROM customers WHERE `Customer Id` = %s", [sample["Customer Id"]], {"PRIMARY"}, None,
+        ),
+        "lookup": (
+            backend.EXPORT_SELECT_BASE + " WHERE `Customer Id` IN " + backend.in_list([1, 2]),
+            [sample["Customer Id"], "missing"], {"PRIMARY"}, None,
+        ),
+        "list_first_page": (page_query(), [PAGE_SIZE + 1], {"idx_customers_index"}, None),
+        "list_next_page": (
+            page_query("`Index` > %s"), [sample["Index"], PAGE_SIZE + 1], {"idx_customers_index"}, None,
+        ),
+    }
+    for field, column in backend.SEARCH_PREFIX_COLUMNS.items():
+        where, params = backend.build_search_query({field: str(sample[column])[:3]})
+        queries[f"search_{field}"] = (
+            page_query(where), params + [PAGE_SIZE + 1], {f"idx_customers_{field}"}, None,
+        )
+
+    where, params = backend.build_search_query({"q": sample["Last Name"][:3]})
+    queries["search_any_name"] = (
+        page_query(where), params + [PAGE_SIZE + 1],
+        {"idx_customers_first_name", "idx_customers_last_name", "idx_customers_company"}, None,
+    )
+    subscribed = date.fromisoformat(str(sample["Subscription Date"]))
+    where, params = backend.build_search_query({"subscribed_from": subscribed, "subscribed_to": subscribed})
+    queries["search_subscribed"] = (
+        page_query(where), params + [PAGE_SIZE + 1], {"idx_customers_subscription_date"}, None,
+    )
+    where, params = backend.build_search_query({"q": sample["Last Name"], "mode": "fulltext"})
+    queries["search_fulltext"] = (
+        page_query(where), params + [PAGE_SIZE + 1], {"ftx_customers_search"}, ("mysql",),
+    )
+    return queries
+
+
+def explain(cursor, dialect, sql, params):
+    """(indexes used on customers, whether any step reads the whole table)"""
+    indexes, full_scan = set(), False
+    if dialect == "mysql":
+        cursor.execute("EXPLAIN " + sql, params)
+        names = [d[0] for d in cursor.description]
+        for row in cursor.fetchall():
+            step = dict(zip(names, row))
+            if step["table"] != "customers":
+                continue
+            full_scan |= step["type"] == "ALL"
+            indexes.update((step["key"] or "").split(",") if step["key"] else ())
+        return indexes, full_scan
+
+    cursor.execute("EXPLAIN QUERY PLAN " + sql.replace("%s", "?"), params)
+    for row in cursor.fetchall():
+        match = SQLITE_STEP.match(row[-1])
+        if not match:
+            continue
+        if match.group(2):
+            indexes.add("PRIMARY" if match.group(2).startswith("sqlite_autoindex_") else match.group(2))
+        elif "PRIMARY KEY" in row[-1]:
+            indexes.add("PRIMARY")
+        else:
+            full_scan = True
+    return indexes, full_scan
+
+
+def check(url):
+    """Print each query's plan; returns the names of the queries that failed"""
+    engine = create_engine(url)
+    dialect = engine.dialect.name
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SELECT COUNT(*) FROM customers")
+        total = cursor.fetchone()[0]
+        cursor.execute(f"SELECT * FROM customers ORDER BY `Index` LIMIT 1 OFFSET {total // 2}")
+        sample = dict(zip([d[0] for d in cursor.description], cursor.fetchone()))
+
+        failed = []
+        for name, (sql, params, allowed, dialects) in hot_queries(sample).items():
+            if dialects and dialect not in dialects:
+                continue
+            indexes, full_scan = explain(cursor, dialect, sql, params)
+            ok = bool(indexes) and indexes <= allowed and not full_scan
+            plan = ", ".join(sorted(indexes)) or "no index"
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<20} {plan}{' + full scan' if full_scan else ''}")
+            if not ok:
+                failed.append(name)
+        return failed
+    finally:
+        raw.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="SQLite file seeded by seed.py")
+    target.add_argument("--url", help="SQLAlchemy URL of a MySQL database seeded by seed.py")
+    args = parser.parse_args()
+
+    failed = check(args.url or f"sqlite:///{args.db}")
+    if failed:
+        print(f"{len(failed)} queries do not use their indexes: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Synthetic customer CSVs scaled up from customers-10000.csv, and scratch databases to load them into."""
+import csv
+import os
+
+from sqlalchemy import create_engine, text
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SOURCE_CSV = os.path.join(ROOT, "customers-10000.csv")
+
+
+def synthetic_csv(rows, path, source=SOURCE_CSV):
+    """Write ``rows`` customers to ``path``, cycling the source rows with unique Index / Customer Id
+
+    Returns ``path``; an existing file with the right row count is reused.
+    """
+    marker = f"{path}.rows"
+    if os.path.exists(path) and os.path.exists(marker):
+        with open(marker) as f:
+            if f.read().strip() == str(rows):
+                return path
+
+    with open(source, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        template_rows = list(reader)
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(1, rows + 1):
+            row = template_rows[(i - 1) % len(template_rows)]
+            writer.writerow([i, f"{i:015X}"] + row[2:])
+
+    with open(marker, "w") as f:
+        f.write(str(rows))
+    return path
+
+
+def reset_database(url):
+    """Empty a scratch database: delete a SQLite file, or drop the loader's tables on MySQL"""
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for table in ("customers", "load_checkpoints", "customer_row_hashes", "schema_migrations"):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    engine.dispose()
@@ -0,0 +1,60 @@
+"""
+Seed a scratch database for bench_app.py with customers-10000.csv or a
+scaled-up synthetic variant, using scripts/load_to_rds.py itself.
+
+    python benchmarks/seed.py --rows 100000 --db /tmp/customers-100k.db
+    python benchmarks/seed.py --rows 1000000 --url mysql+pymysql://root:pw@127.0.0.1/bench
+
+The loader's schema migrations create the keys and indexes the app relies
+on; SQLite databases are also ANALYZEd so the planner picks them.
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from datasets import ROOT, SOURCE_CSV, reset_database, synthetic_csv
+
+def seed(rows, url, workdir=None):
+    """Replace the contents of ``url`` with ``rows`` customers; returns the row count loaded"""
+    if rows == 10000:
+        csv_path = SOURCE_CSV
+    else:
+        workdir = workdir or tempfile.gettempdir()
+        csv_path = synthetic_csv(rows, os.path.join(workdir, f"customers-{rows}.csv"))
+
+    reset_database(url)
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "scripts", "load_to_rds.py"),
+         "--input", csv_path, "--strategy", "executemany", "--restart"],
+        check=True, env={**os.environ, "DATABASE_URL": url},
+    )
+
+    if url.startswith("sqlite:///"):
+        conn = sqlite3.connect(url[len("sqlite:///"):])
+        try:
+            conn.execute("ANALYZE")
+            conn.commit()
+            return conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+        finally:
+            conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="SQLite file to create")
+    target.add_argument("--url", help="SQLAlchemy URL of a scratch MySQL database")
+    parser.add_argument("--rows", type=int, default=10000, help="10000 uses customers-10000.csv as-is")
+    parser.add_argument("--workdir", default=None, help="Where synthetic CSVs are generated and cached")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.abspath(args.db)}"
+    print(f"Seeded {seed(args.rows, url, args.workdir)} customers into {args.db or 'the MySQL database'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import asyncio
+import ipaddress
+import math
+import time
+from collections import OrderedDict, deque
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+
+class TokenBuckets:
+    """Token buckets per key: ``rate`` tokens a second, holding at most ``burst``
+
+    Buckets live in a bounded LRU; one evicted for being idle would have
+    refilled by then anyway. Only used from the event loop, so no lock.
+    """
+
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> (tokens, monotonic time they were counted)
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key) -> float:
+        """Take a token for ``key``: 0 when there was one, else seconds until there will be"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.burst
+            if len(self._buckets) >= self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            self._buckets.move_to_end(key)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self.allowed += 1
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def give_back(self, key):
+        """Return the token of an attempt that turned out not to count"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets[key] = (min(self.burst, bucket[0] + 1), bucket[1])
+
+    def stats(self):
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+class AdmissionControl:
+    """Decides which requests are served, queued briefly, or shed
+
+    A request is refused with 429 when its client is out of tokens, overall
+    or for the route it targets. Admitted requests then need one of
+    ``max_in_flight`` slots; up to ``max_queue`` more wait at most
+    ``queue_timeout`` seconds for one, and anything beyond is refused with
+    503 straight away rather than piling up behind the database pool.
+    Limits are per worker process.
+    """
+
+    def __init__(self, max_in_flight=0, max_queue=0, queue_timeout=0.5,
+                 clients=None, routes=None, retry_after=1):
+        self.max_in_flight = max_in_flight  # 0 disables the cap
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clients = clients
+        self.routes = routes or {}  # route template -> TokenBuckets keyed by client
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters = deque()
+        self.queued = 0
+        self.shed = {"client_rate": 0, "route_rate": 0, "overload": 0}
+
+    def rate_limited(self, client, route):
+        """Seconds the request should wait before retrying, or 0 when it may proceed"""
+        if client is None:
+            return 0
+        # The route first, so a request refused there does not use up the client's overall budget
+        buckets = self.routes.get(route) if route else None
+        if buckets is not None:
+            wait = buckets.take(client)
+            if wait:
+                self.shed["route_rate"] += 1
+                return wait
+        if self.clients is not None:
+            wait = self.clients.take(client)
+            if wait:
+                if buckets is not None:
+                    buckets.give_back(client)
+                self.shed["client_rate"] += 1
+                return wait
+        return 0
+
+    async def enter(self) -> bool:
+        """Take an in-flight slot, waiting briefly for one; False when the request must be shed"""
+        if not self.max_in_flight or self.in_flight < self.max_in_flight:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed["overload"] += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # leave() hands its slot over by resolving the future, so in_flight already counts us
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.shed["overload"] += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.leave()  # the client went away just as a slot was handed over; pass it on
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def leave(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": len(self._waiters),
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+            "clients": self.clients.stats() if self.clients is not None else None,
+            "routes": {route: buckets.stats() for route, buckets in self.routes.items()},
+        }
+
+
+class ForwardedClientMiddleware:
+    """Pure ASGI middleware taking the client address from X-Forwarded-For
+
+    Like uvicorn's proxy headers, except that ``trusted`` may list networks
+    as well as addresses: a cloud load balancer's addresses change within its
+    subnets. When the peer is trusted, the client is the rightmost
+    X-Forwarded-For entry that is not, so a client cannot pick its own
+    address by sending the header itself.
+    """
+
+    def __init__(self, app, trusted=()):
+        self.app = app
+        self.trusted = [ipaddress.ip_network(entry, strict=False) for entry in trusted if entry != "*"]
+
+    def _is_trusted(self, host):
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted)
+
+    async def __call__(self, scope, receive, send):
+        client = scope.get("client") if scope["type"] == "http" else None
+        if client and self.trusted and self._is_trusted(client[0]):
+            forwarded = b",".join(value for name, value in scope["headers"] if name == b"x-forwarded-for")
+            hops = [hop.strip() for hop in forwarded.decode("latin-1").split(",") if hop.strip()]
+            host = next((hop for hop in reversed(hops) if not self._is_trusted(hop)), None)
+            if host:
+                scope = dict(scope, client=(host, 0))
+        await self.app(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying AdmissionControl before anything else runs
+
+    Clients are identified by ``scope["client"]``, which
+    ForwardedClientMiddleware resolves from X-Forwarded-For for the proxies
+    in FORWARDED_ALLOW_IPS. Paths in
+    ``exempt`` (probes, scrapes) are never limited. Route limits are keyed by
+    path template, like the cache policies; only the routes that have one
+    are matched against, since routing proper happens further in.
+    """
+
+    def __init__(self, app, control, routes=(), exempt=()):
+        self.app = app
+        self.control = control
+        self.all_routes = routes
+        self.exempt = frozenset(exempt)
+        self._limited_routes = None
+
+    def _route(self, scope):
+        if self._limited_routes is None:
+            # Routes are all registered by the first request
+            self._limited_routes = [r for r in self.all_routes if getattr(r, "path", None) in self.control.routes]
+        for route in self._limited_routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        route = self._route(scope) if self.control.routes else None
+        wait = self.control.rate_limited(client[0] if client else None, route)
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+        if not await self.control.enter():
+            response = JSONResponse(
+                {"detail": "Server is busy"},
+                status_code=503,
+                headers={"Retry-After": str(self.control.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.leave()
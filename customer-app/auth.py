@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from cache import LRUCache
+from metrics import phase
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """passlib context, imported on the first login rather than at every worker start"""
+    from passlib.context import CryptContext
+
+    # "plaintext" only matches stored values that are not bcrypt hashes, i.e. the
+    # development fallback below; passlib compares those in constant time.
+    return CryptContext(schemes=["bcrypt", "plaintext"], deprecated="auto")
+
+
+class VerifierBusy(Exception):
+    """Raised when too many password verifications are already queued"""
+
+
+class TooManyAttempts(Exception):
+    """Raised when a client has used up its password attempts for a username for now"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many password attempts; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def load_admin_credentials():
+    """Admin username -> stored credential
+
+    Production deployments set ADMIN_PASSWORD_HASH to a precomputed bcrypt
+    hash (generate one with ``python auth.py``). Hashing a plaintext password
+    at import would slow every pod start without making it any safer, so the
+    ADMIN_PASSWORD fallback is kept as-is and compared directly.
+    """
+    password_hash = os.getenv("ADMIN_PASSWORD_HASH")
+    if password_hash:
+        return {"admin": password_hash}
+    logger.warning("ADMIN_PASSWORD_HASH is not set; using plaintext ADMIN_PASSWORD (development only)")
+    return {"admin": os.getenv("ADMIN_PASSWORD", "admin123")}
+
+
+class PasswordVerifier:
+    """Runs bcrypt verification on a bounded worker pool
+
+    bcrypt releases the GIL, so verifications on the worker threads run in
+    parallel without blocking the event loop. At most ``max_pending``
+    verifications may be queued or running; further callers wait up to
+    ``queue_timeout`` seconds and then get VerifierBusy. Successful checks
+    are remembered for ``cache_ttl`` seconds under an HMAC of the
+    credentials keyed with a per-process secret, so repeated Basic-auth
+    requests skip bcrypt and plaintext passwords are never stored.
+
+    With ``attempts`` (admission.TokenBuckets keyed by username and client)
+    every check that would reach bcrypt first takes a token from that bucket
+    and a correct password gives it back, so only failures are rate limited
+    and a guessing client is refused with TooManyAttempts before costing a
+    hash. Keyed by both, one client's failures never lock out the same
+    account elsewhere, nor that client's other accounts.
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, queue_timeout=5.0,
+                 cache_ttl=300.0, cache_size=1024, attempts=None):
+        self.max_workers = max_workers
+        self._executor = None  # started on first use, so the app can be started again after close()
+        self._pending = asyncio.Semaphore(max_pending)
+        self.queue_timeout = queue_timeout
+        self.cache_ttl = cache_ttl
+        self._cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_key = secrets.token_bytes(32)
+        self.attempts = attempts
+
+    def _fingerprint(self, username, password, stored_hash):
+        message = "\0".join((username, password, stored_hash)).encode("utf-8")
+        return hmac.new(self._cache_key, message, hashlib.sha256).digest()
+
+    async def verify(self, username: str, password: str, stored_hash, client=None) -> bool:
+        """Check ``password`` against ``stored_hash`` without blocking the event loop"""
+        if not stored_hash:
+            return False
+
+        fingerprint = None
+        if self.cache_ttl > 0:
+            fingerprint = self._fingerprint(username, password, stored_hash)
+            if self._cache.get(fingerprint):
+                return True
+
+        throttled = self.attempts is not None and client is not None
+        attempts_key = (username, client)
+        if throttled:
+            wait = self.attempts.take(attempts_key)
+            if wait:
+                raise TooManyAttempts(wait)
+        valid = None  # stays None if bcrypt never ran
+        try:
+            try:
+                await asyncio.wait_for(self._pending.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise VerifierBusy("Too many concurrent credential checks")
+            try:
+                loop = asyncio.get_running_loop()
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+                with phase("bcrypt"):
+                    valid = await loop.run_in_executor(self._executor, pwd_context().verify, password, stored_hash)
+            finally:
+                self._pending.release()
+        finally:
+            # Only wrong passwords count; a busy verifier is not the client's fault either
+            if throttled and valid is not False:
+                self.attempts.give_back(attempts_key)
+
+        if valid and fingerprint is not None:
+            self._cache.set(fingerprint, True)
+        return valid
+
+    def stats(self):
+        return {
+            "cache": self._cache.stats(),
+            "attempts": self.attempts.stats() if self.attempts is not None else None,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+if __name__ == "__main__":
+    # Generate a value for ADMIN_PASSWORD_HASH
+    import getpass
+    from passlib.context import CryptContext
+    print(CryptContext(schemes=["bcrypt"]).hash(getpass.getpass("Admin password: ")))
@@ -1,19 +1,46 @@
-from fastapi import FastAPI, Request, Form, HTTPException, Depends, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, Query, status
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse, PlainTextResponse, Response,
+)
 from fastapi.templating import Jinja2Templates
+from fastapi.encoders import jsonable_encoder
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from markupsafe import Markup
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from starlette.middleware.sessions import SessionMiddleware
 import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
-from typing import Dict, ClassVar
-from pydantic import BaseModel, field_validator, ValidationError
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator, ValidationError
 import secrets
-from contextlib import contextmanager
-from passlib.context import CryptContext
+import asyncio
+import functools
+from contextlib import contextmanager, asynccontextmanager
 import logging
-import re
+import csv
+import io
+import json
+import hashlib
+import math
+import time
+from datetime import date
+from urllib.parse import urlencode
+
+from db import (
+    ConnectionPool, PoolTimeout, PoolClosed, AsyncDatabase, SQLiteConnection,
+    ReplicaSet, NoReplicaAvailable, PrimaryReadsMiddleware, pin_primary_reads, primary_reads, reading_from_primary,
+)
+from cache import CachedValue, CustomerCache, DataVersion, LRUCache, backend_from_url
+from auth import PasswordVerifier, TooManyAttempts, VerifierBusy, load_admin_credentials
+from admission import AdmissionControl, AdmissionMiddleware, ForwardedClientMiddleware, TokenBuckets
+from metrics import Registry, Gauge, RequestMetrics, phase
+from validation import clean_name
+from write_queue import WriteQueue
+from sessions import SessionMiddleware, SessionStore, SessionTokens
+from httpcache import (
+    CacheControlMiddleware, CompressionMiddleware, etag_matches, http_date, not_modified_since, to_timestamp,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,11 +49,160 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI()
+# Database configuration
+db_config = {
+    "host": os.getenv("DB_HOST"),
+    "user": os.getenv("DB_USERNAME"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "connection_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+}
+
+# "sqlite" runs against DB_SQLITE_PATH instead of MySQL (local development and benchmarks)
+DB_DRIVER = os.getenv("DB_DRIVER", "mysql")
+
+def connect(host=None):
+    """Connection to the primary, or to ``host`` (host[:port], or a file path with SQLite)"""
+    if DB_DRIVER == "sqlite":
+        return SQLiteConnection(host or os.getenv("DB_SQLITE_PATH", "customers.db"))
+    if host is None:
+        return mysql.connector.connect(**db_config)
+    name, _, port = host.partition(":")
+    return mysql.connector.connect(**{**db_config, "host": name, "port": int(port or db_config["port"])})
+
+# Connection pool settings
+pool_config = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+    "recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),  # seconds; RDS drops idle conns after wait_timeout
+    "pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+# Read replicas, comma-separated host[:port]; each gets a pool sized like the primary's.
+# Reads go to a healthy replica, writes and everything inside a transaction to DB_HOST.
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+replica_config = {
+    "retry_after": float(os.getenv("DB_REPLICA_RETRY_AFTER", "30")),  # seconds a failed replica is skipped
+    "max_lag": float(os.getenv("DB_REPLICA_MAX_LAG")) if os.getenv("DB_REPLICA_MAX_LAG") else None,
+}
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))  # 0 disables active checks
+# After a write, the writer's session reads from the primary for this long; keep it above the usual replica lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# How often updated_at and the FULLTEXT index are looked up again, e.g. after a migration; 0 disables
+SCHEMA_CHECK_INTERVAL = float(os.getenv("SCHEMA_CHECK_INTERVAL", "60"))
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Threads running blocking driver calls; more than the pools' capacity would only queue on checkout
+db_executor_workers = int(os.getenv(
+    "DB_EXECUTOR_WORKERS", str((pool_config["pool_size"] + pool_config["max_overflow"]) * (1 + len(DB_REPLICA_HOSTS)))
+))
+
+# Write-behind for the update and delete forms: concurrent edits are coalesced per
+# customer and committed together; each request still waits for its commit.
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() == "true"
+write_queue_config = {
+    "max_batch": int(os.getenv("WRITE_BATCH_SIZE", "100")),
+    "max_delay": float(os.getenv("WRITE_BATCH_DELAY_MS", "5")) / 1000,
+}
+
+# Created in lifespan() so their lifetime matches the app's
+db_pool = None
+replicas = None
+database = None
+# Whether customers has the `updated_at` column created by scripts/schema.py
+has_updated_at = False
+# Whether has_updated_at and has_fulltext come from the database yet; False while it was unreachable
+schema_detected = False
+# Whether the FULLTEXT index behind mode=fulltext exists (MySQL, migration 3)
+has_fulltext = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the connection pool at startup and close it at shutdown
+
+    Everything that needs the database or is only worth doing once the
+    worker will serve happens here rather than at import; the phase
+    timings are logged so a slow cold start can be traced.
+    """
+    global db_pool, replicas, database
+    started = time.perf_counter()
+    db_pool = ConnectionPool(connect, **pool_config)
+    if DB_REPLICA_HOSTS:
+        replicas = ReplicaSet(
+            [ConnectionPool(functools.partial(connect, host), name=f"replica-{i}", **pool_config)
+             for i, host in enumerate(DB_REPLICA_HOSTS, 1)],
+            lag=replica_lag,
+            **replica_config,
+        )
+    database = AsyncDatabase(get_db_connection, max_workers=db_executor_workers, read_connection=get_read_connection)
+    # Templates compile on this thread while the executor waits on the connects
+    prefill = asyncio.ensure_future(database.run(db_pool.prefill))
+    replica_prefill = asyncio.ensure_future(database.run(replicas.prefill)) if replicas else None
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+    opened = await prefill
+    logger.info(f"Database pool ready with {opened}/{db_pool.pool_size} connections")
+    health_checks = None
+    if replicas:
+        opened = await replica_prefill
+        await database.run(replicas.check)
+        logger.info(f"{len(replicas.pools)} read replicas ready with {opened} connections")
+        if DB_REPLICA_CHECK_INTERVAL > 0:
+            health_checks = asyncio.ensure_future(check_replicas())
+    pool_ready = time.perf_counter()
+    await detect_schema()
+    schema_checks = asyncio.ensure_future(check_schema()) if SCHEMA_CHECK_INTERVAL > 0 else None
+    await warm_caches()
+    logger.info(
+        f"Startup took {(time.perf_counter() - started) * 1000:.0f}ms "
+        f"(pool and templates {(pool_ready - started) * 1000:.0f}ms, "
+        f"cache warm-up {(time.perf_counter() - pool_ready) * 1000:.0f}ms)"
+    )
+    try:
+        yield
+    finally:
+        if health_checks:
+            health_checks.cancel()
+        if schema_checks:
+            schema_checks.cancel()
+        if write_queue:
+            await write_queue.close()
+        await customer_cache.close()
+        if session_tokens.store is not None:
+            await session_tokens.store.close()
+        password_verifier.close()
+        database.close()
+        db_pool.close()
+        if replicas:
+            replicas.close()
+            replicas = None  # a restarted app only has replicas if DB_REPLICA_HOSTS still lists some
+        logger.info("Database pool closed")
+
+async def check_replicas():
+    """Health-check the replicas every DB_REPLICA_CHECK_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(DB_REPLICA_CHECK_INTERVAL)
+        try:
+            await database.run(replicas.check)
+        except Exception as e:
+            logger.warning(f"Replica health check failed: {e}")
+
+async def warm_caches():
+    """Load what the first requests would otherwise pay for, before the worker takes traffic"""
+    try:
+        await customer_count.get()
+        users, _, _ = await fetch_customer_page()
+        for user in users:
+            render_row(user, False)
+            render_row(user, True)
+        logger.info(f"Caches warmed with the first {len(users)} customers")
+    except Exception as e:
+        # A cold cache only costs latency; the readiness probe decides whether the DB is usable
+        logger.warning(f"Cache warm-up failed: {e}")
+
+# Initialize FastAPI app
+app = FastAPI(lifespan=lifespan)
 
 # Generate secret key if not in environment (for development only)
 if not os.getenv("SESSION_SECRET"):
@@ -34,101 +210,685 @@ if not os.getenv("SESSION_SECRET"):
     logger.warning(f"Using generated session key for development: {generated_key}")
     os.environ["SESSION_SECRET"] = generated_key
 
-# Add SessionMiddleware
+# Session key holding the time until which the session reads from the primary
+PRIMARY_READS_KEY = "primary_reads_until"
+# Added before SessionMiddleware so it runs inside it and can see the session
+app.add_middleware(PrimaryReadsMiddleware, session_key=PRIMARY_READS_KEY)
+
+# Sessions: signed cookies by default. SESSION_STORE_URL keeps the data server-side
+# instead (memory:// is per worker, so only for a single worker; redis:// is shared).
+SESSION_MAX_AGE = 3600  # 1 hour session duration
+session_store_url = os.getenv("SESSION_STORE_URL")
+session_tokens = SessionTokens(
+    os.getenv("SESSION_SECRET"),
+    max_age=SESSION_MAX_AGE,
+    store=SessionStore(
+        maxsize=int(os.getenv("SESSION_CACHE_SIZE", "10000")),
+        ttl=SESSION_MAX_AGE,
+        backend=backend_from_url(session_store_url),
+        local_ttl=float(os.getenv("SESSION_LOCAL_TTL", "1")),
+    ) if session_store_url else None,
+    cache_size=int(os.getenv("SESSION_CACHE_SIZE", "10000")),
+)
 app.add_middleware(
     SessionMiddleware,
-    secret_key=os.getenv("SESSION_SECRET"),
+    tokens=session_tokens,
     session_cookie="secure_session",
     https_only=os.getenv("ENVIRONMENT") == "production",  # True in production
-    max_age=3600,  # 1 hour session duration
     same_site="lax"
 )
 
-# Database configuration
-db_config = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USERNAME"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT", "3306")),
+# --- HTTP caching and compression ---
+# Route template -> Cache-Control; anything not listed (writes, login, exports, ops endpoints) is no-store.
+# Pages are stored by the browser but revalidated on every use, which costs a 304 when unchanged.
+CACHE_POLICIES = {
+    "/": "private, no-cache",
+    "/search": "private, no-cache",
+    "/user/{user_id}": "private, no-cache",
+    "/api/v1/customers": "private, no-cache",
+    "/api/v1/customers/search": "private, no-cache",
 }
+app.add_middleware(CacheControlMiddleware, policies=CACHE_POLICIES)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    gzip_level=int(os.getenv("GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("BROTLI_QUALITY", "4")),
+)
 
-# Admin credentials (in production, use database authentication)
-ADMIN_CREDENTIALS = {
-    "admin": pwd_context.hash(os.getenv("ADMIN_PASSWORD", "admin123"))
+# --- Admission control ---
+# Bursts get a quick 429 or 503 with Retry-After instead of queueing on the DB pool.
+# Every limit is per worker process; a rate of 0 disables it.
+def token_buckets(rate, burst):
+    """TokenBuckets refilling ``rate`` tokens a second, or None when the rate is 0"""
+    return TokenBuckets(rate, max(1, burst)) if rate > 0 else None
+
+EXPORT_RATE_LIMIT = (float(os.getenv("EXPORT_RATE_PER_SECOND", "0.5")), int(os.getenv("EXPORT_BURST", "2")))
+SEARCH_RATE_LIMIT = (float(os.getenv("SEARCH_RATE_PER_SECOND", "10")), int(os.getenv("SEARCH_BURST", "20")))
+# Route template -> (requests a second, burst) per client, on top of the overall client limit.
+# The exports and the stream read the whole table; searches are the costliest paged queries.
+ROUTE_RATE_LIMITS = {
+    "/export.csv": EXPORT_RATE_LIMIT,
+    "/export.ndjson": EXPORT_RATE_LIMIT,
+    "/stream": EXPORT_RATE_LIMIT,
+    "/search": SEARCH_RATE_LIMIT,
+    "/api/v1/customers/search": SEARCH_RATE_LIMIT,
 }
+admission = AdmissionControl(
+    # Requests beyond the pools' capacity would only wait for a connection; twice that
+    # leaves room for the cached pages, which never check one out
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", str(2 * db_executor_workers))),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", str(db_executor_workers))),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.5")),
+    clients=token_buckets(float(os.getenv("RATE_LIMIT_PER_SECOND", "20")), int(os.getenv("RATE_LIMIT_BURST", "40"))),
+    routes={
+        route: buckets for route, (rate, burst) in ROUTE_RATE_LIMITS.items()
+        if (buckets := token_buckets(rate, burst)) is not None
+    },
+)
+# Probes and scrapes must get through exactly when the worker is overloaded
+ADMISSION_EXEMPT = ("/health", "/ready", "/metrics")
+# Wrong admin passwords per username and client; each costs a bcrypt verify
+login_attempts = token_buckets(
+    float(os.getenv("LOGIN_ATTEMPTS_PER_MINUTE", "5")) / 60, int(os.getenv("LOGIN_ATTEMPTS_BURST", "5"))
+)
+
+# Runs inside RequestMetrics, so shed requests are still counted (as "unmatched")
+app.add_middleware(AdmissionMiddleware, control=admission, routes=app.routes, exempt=ADMISSION_EXEMPT)
+# Added last but one, outside admission control and the login throttle, which both key on the
+# client address. FORWARDED_ALLOW_IPS lists the load balancer's addresses or networks (e.g. the
+# VPC's CIDR); gunicorn hands the same value to uvicorn, which only matches exact addresses.
+app.add_middleware(
+    ForwardedClientMiddleware,
+    trusted=[entry.strip() for entry in os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1").split(",") if entry.strip()],
+)
+
+# --- Metrics ---
+metrics_registry = Registry()
+
+# Outermost middleware so timings include session handling; SLOW_REQUEST_MS=0 disables the slow log
+app.add_middleware(
+    RequestMetrics,
+    registry=metrics_registry,
+    slow_request_ms=float(os.getenv("SLOW_REQUEST_MS", "0")),
+)
+
+# Admin credentials (in production, use database authentication)
+ADMIN_CREDENTIALS = load_admin_credentials()
+
+# bcrypt runs on its own small pool so logins never block the event loop
+password_verifier = PasswordVerifier(
+    max_workers=int(os.getenv("AUTH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv("AUTH_MAX_PENDING", "32")),
+    queue_timeout=float(os.getenv("AUTH_QUEUE_TIMEOUT", "5")),
+    cache_ttl=float(os.getenv("AUTH_CACHE_TTL", "300")),  # 0 disables the verified-credential cache
+    attempts=login_attempts,
+)
 
-templates = Jinja2Templates(directory="templates")
+# Templates are compiled once at startup; only development re-checks them for changes.
+# TEMPLATE_CACHE_DIR persists compiled bytecode across restarts.
+template_options = {
+    "auto_reload": os.getenv("ENVIRONMENT") == "development",
+    "bytecode_cache": FileSystemBytecodeCache(os.getenv("TEMPLATE_CACHE_DIR")) if os.getenv("TEMPLATE_CACHE_DIR") else None,
+}
+templates = Jinja2Templates(directory="templates", **template_options)
+# Async environment so streamed pages can loop over rows as they arrive from the DB
+stream_templates = Environment(
+    loader=FileSystemLoader("templates"), autoescape=True, enable_async=True, **template_options
+)
 security = HTTPBasic()
+optional_security = HTTPBasic(auto_error=False)
+
+# Listing configuration
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+CUSTOMER_COUNT_TTL = float(os.getenv("CUSTOMER_COUNT_TTL", "300"))  # seconds
+
+# Only the columns index.html renders; `Index` is the keyset pagination key
+LIST_COLUMNS = ["Index", "Customer Id", "First Name", "Last Name", "Company", "City", "Country"]
+LIST_SELECT = "SELECT " + ", ".join(f"`{c}`" for c in LIST_COLUMNS) + " FROM customers"
+LIST_SELECT_UPDATED_AT = "SELECT " + ", ".join(f"`{c}`" for c in LIST_COLUMNS + ["updated_at"]) + " FROM customers"
+
+# Streaming export configuration
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", "65536"))
+EXPORT_COLUMNS = [
+    "Index", "Customer Id", "First Name", "Last Name", "Company", "City", "Country",
+    "Phone 1", "Phone 2", "Email", "Subscription Date", "Website",
+]
+EXPORT_SELECT_BASE = "SELECT " + ", ".join(f"`{c}`" for c in EXPORT_COLUMNS) + " FROM customers"
+EXPORT_SELECT = EXPORT_SELECT_BASE + " ORDER BY `Index`"
+
+# JSON API configuration; batches are bound as one IN (...) list, so keep them bounded
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "1000"))
 
 # --- Models ---
 class UserUpdateForm(BaseModel):
     first_name: str
     last_name: str
-    re_module: ClassVar = re  # Properly declare the re module as ClassVar
 
     @field_validator('first_name')
     def validate_first_name(cls, v):
-        v = v.strip()  # Trim any leading/trailing spaces
-        if len(v) < 2 or len(v) > 50:
-            raise ValueError('First name must be between 2 and 50 characters')
-        if not cls.re_module.match(r"^[A-Za-z\s'-]+$", v):  # Use cls.re_module
-            raise ValueError('First name must contain only alphabets, spaces, apostrophes, or hyphens')
-        return v
+        return clean_name(v, "First name")
 
     @field_validator('last_name')
     def validate_last_name(cls, v):
-        v = v.strip()  # Trim any leading/trailing spaces
-        if len(v) < 2 or len(v) > 50:
-            raise ValueError('Last name must be between 2 and 50 characters')
-        if not cls.re_module.match(r"^[A-Za-z\s'-]+$", v):  # Use cls.re_module
-            raise ValueError('Last name must contain only alphabets, spaces, apostrophes, or hyphens')
-        return v
+        return clean_name(v, "Last name")
+
+class CustomerUpdate(UserUpdateForm):
+    customer_id: str = Field(..., min_length=1, max_length=64)
+
+class BulkUpdateRequest(BaseModel):
+    updates: List[CustomerUpdate] = Field(..., min_length=1, max_length=API_MAX_BATCH)
+
+class CustomerIdsRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=API_MAX_BATCH)
+
+class CustomerLookupRequest(CustomerIdsRequest):
+    fields: Optional[List[str]] = None
 
 # --- Database Utilities ---
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = None
+    """Context manager that borrows a connection from the pool"""
+    try:
+        with phase("db_acquire"):
+            conn = db_pool.acquire()
+    except (Error, PoolTimeout, PoolClosed) as e:
+        logger.error(f"Database connection error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed"
+        )
     try:
-        conn = mysql.connector.connect(**db_config)
         yield conn
     except Error as e:
-        logger.error(f"Database connection error: {e}")
+        logger.error(f"Database error: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database connection failed"
         )
     finally:
-        if conn and conn.is_connected():
-            conn.close()
+        db_pool.release(conn)
 
 @contextmanager
-def get_db_cursor(conn):
-    """Context manager for database cursors"""
-    cursor = None
+def get_read_connection():
+    """Borrow a replica connection for a read; the primary when pinned or no replica is up"""
+    if replicas is None or reading_from_primary():
+        with get_db_connection() as conn:
+            yield conn
+        return
     try:
-        cursor = conn.cursor(dictionary=True, buffered=True)
-        yield cursor
+        with phase("db_acquire"):
+            pool, conn = replicas.acquire()
+    except NoReplicaAvailable:
+        with get_db_connection() as conn:
+            yield conn
+        return
+    except (PoolTimeout, PoolClosed) as e:
+        logger.error(f"Database connection error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed"
+        )
+    try:
+        yield conn
+    except Error as e:
+        # Later reads skip this replica until a health check passes again
+        replicas.mark_down(pool, e)
+        logger.error(f"Database error on {pool.name}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed"
+        )
     finally:
-        if cursor:
-            cursor.close()
+        pool.release(conn)
+
+def replica_lag(conn):
+    """Seconds a MySQL replica is behind its source; None when unknown"""
+    if DB_DRIVER == "sqlite":
+        return None
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")  # MySQL 8.0.22+
+        except Error:
+            cursor.execute("SHOW SLAVE STATUS")
+        row = cursor.fetchone()
+    except Error as e:
+        # e.g. the app user lacks REPLICATION CLIENT; then only reachability is checked
+        logger.debug(f"Could not read replica lag: {e}")
+        return None
+    finally:
+        cursor.close()
+    if not row:
+        return None
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+def pin_reads_to_primary(request: Request):
+    """Send this session's reads to the primary until replicas have caught up with its write"""
+    if replicas is not None and READ_YOUR_WRITES_SECONDS > 0:
+        request.session[PRIMARY_READS_KEY] = time.time() + READ_YOUR_WRITES_SECONDS
+        # The rest of this request too, e.g. a page re-rendered after a failed update
+        pin_primary_reads()
+
+def replicas_current():
+    """Whether reads made now are known to include the app's last write
+
+    Results read from a replica during the read-your-writes window after a
+    write may predate it, so they are served but not cached.
+    """
+    return (
+        replicas is None
+        or reading_from_primary()
+        or time.time() - data_version.changed_at > READ_YOUR_WRITES_SECONDS
+    )
+
+def render_template(name: str, context: dict, status_code: int = 200):
+    """TemplateResponse with rendering time attributed to the "render" phase"""
+    with phase("render"):
+        return templates.TemplateResponse(name, context, status_code=status_code)
+
+def detect_updated_at():
+    """Whether customers has `updated_at`; None when the database cannot be reached"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT updated_at FROM customers LIMIT 0")
+                cursor.fetchall()
+                return True
+            except Exception:
+                return False
+            finally:
+                cursor.close()
+    except HTTPException:
+        return None
+
+async def detect_schema():
+    """Look up the optional schema features; keeps the defaults while the database is down
+
+    A pod may start before its database is reachable: it then stays up but
+    unready, and the first readiness check that reaches the database runs
+    this again. check_schema() also repeats it, so migrations applied while
+    the app runs are picked up.
+    """
+    global has_updated_at, has_fulltext, schema_detected
+    updated_at = await database.run(detect_updated_at)
+    fulltext = await database.run(detect_fulltext)
+    if updated_at is None or fulltext is None:
+        logger.warning("Database unreachable; schema features stay as they are until it can be checked")
+        return
+    if not schema_detected or updated_at != has_updated_at:
+        logger.info(f"Last-Modified from customers.updated_at: {'enabled' if updated_at else 'column missing'}")
+    if not schema_detected or fulltext != has_fulltext:
+        logger.info(f"Full-text search: {'enabled' if fulltext else 'index missing, using prefix search'}")
+    has_updated_at, has_fulltext = updated_at, fulltext
+    schema_detected = True
+
+async def check_schema():
+    """Detect the schema again every SCHEMA_CHECK_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(SCHEMA_CHECK_INTERVAL)
+        try:
+            await detect_schema()
+        except Exception as e:
+            logger.warning(f"Schema check failed: {e}")
+
+def detect_fulltext():
+    """Whether the FULLTEXT index exists; None when the database cannot be reached"""
+    if DB_DRIVER != "mysql":
+        return False
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SHOW INDEX FROM customers WHERE Key_name = %s", (FULLTEXT_INDEX,))
+                return bool(cursor.fetchall())
+            except Exception:
+                return False
+            finally:
+                cursor.close()
+    except HTTPException:
+        return None
+
+async def count_customers():
+    # From the primary: the count is reloaded right after deletes and then kept for CUSTOMER_COUNT_TTL
+    with primary_reads():
+        row = await database.fetch_one("SELECT COUNT(*) AS total FROM customers")
+    return row["total"]
+
+# Total shown on the listing; refreshed on a TTL and after deletes instead of per request
+customer_count = CachedValue(count_customers, ttl=CUSTOMER_COUNT_TTL)
+
+async def fetch_customer_page(after=None, before=None, page_size=PAGE_SIZE,
+                              where=None, params=(), select=None):
+    """Fetch one keyset page ordered by `Index`, optionally filtered by ``where``
+
+    Returns (rows, has_prev, has_next). Fetches one extra row to learn
+    whether another page exists without a COUNT query.
+    """
+    conditions = [where] if where else []
+    params = list(params)
+    if before is not None:
+        conditions.append("`Index` < %s")
+        params.append(before)
+    elif after is not None:
+        conditions.append("`Index` > %s")
+        params.append(after)
+
+    sql = select or (LIST_SELECT_UPDATED_AT if has_updated_at else LIST_SELECT)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY `Index` DESC LIMIT %s" if before is not None else " ORDER BY `Index` LIMIT %s"
+    rows = await database.fetch_all(sql, tuple(params + [page_size + 1]))
+
+    if before is not None:
+        has_prev = len(rows) > page_size
+        return list(reversed(rows[:page_size])), has_prev, True
+    return rows[:page_size], after is not None, len(rows) > page_size
+
+def page_url(path: str, page_size: int, filters=None, **cursor) -> str:
+    params = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+    params.update({k: v for k, v in cursor.items() if v is not None})
+    if page_size != PAGE_SIZE:
+        params["page_size"] = page_size
+    return f"{path}?{urlencode(params)}" if params else path
+
+# --- Search ---
+# Query parameter -> column matched by prefix; each has a secondary index
+# created by scripts/schema.py
+SEARCH_PREFIX_COLUMNS = {
+    "first_name": "First Name",
+    "last_name": "Last Name",
+    "company": "Company",
+    "city": "City",
+    "country": "Country",
+    "email": "Email",
+}
+# Must list exactly the columns of the FULLTEXT index for MATCH() to use it
+FULLTEXT_COLUMNS = ["First Name", "Last Name", "Company", "City", "Country", "Email"]
+FULLTEXT_INDEX = "ftx_customers_search"
+SEARCH_MODES = ("prefix", "fulltext")
+
+def like_prefix(value: str) -> str:
+    """Escape LIKE wildcards so user input only ever matches as a literal prefix"""
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+
+def build_search_query(filters: dict):
+    """Translate search filters into a parameterized WHERE clause
+
+    Returns (where_sql, params); where_sql is None when no filter is set.
+    """
+    conditions, params = [], []
+    for field, column in SEARCH_PREFIX_COLUMNS.items():
+        value = (filters.get(field) or "").strip()
+        if value:
+            conditions.append(f"`{column}` LIKE %s ESCAPE '!'")
+            params.append(like_prefix(value))
+
+    q = (filters.get("q") or "").strip()
+    if q:
+        if filters.get("mode") == "fulltext":
+            columns = ", ".join(f"`{c}`" for c in FULLTEXT_COLUMNS)
+            conditions.append(f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(q)
+        else:
+            # OR of prefix matches; MySQL answers this with an index_merge union
+            pattern = like_prefix(q)
+            conditions.append(
+                "(`First Name` LIKE %s ESCAPE '!' OR `Last Name` LIKE %s ESCAPE '!' "
+                "OR `Company` LIKE %s ESCAPE '!')"
+            )
+            params.extend([pattern, pattern, pattern])
+
+    if filters.get("subscribed_from"):
+        conditions.append("`Subscription Date` >= %s")
+        params.append(filters["subscribed_from"].isoformat())
+    if filters.get("subscribed_to"):
+        conditions.append("`Subscription Date` <= %s")
+        params.append(filters["subscribed_to"].isoformat())
+
+    if not conditions:
+        return None, []
+    return " AND ".join(conditions), params
+
+def search_filters(
+    q: Optional[str] = None,
+    mode: str = Query("prefix", pattern="^(prefix|fulltext)$"),
+    first_name: Optional[str] = Query(None, max_length=50),
+    last_name: Optional[str] = Query(None, max_length=50),
+    company: Optional[str] = Query(None, max_length=100),
+    city: Optional[str] = Query(None, max_length=100),
+    country: Optional[str] = Query(None, max_length=100),
+    email: Optional[str] = Query(None, max_length=100),
+    subscribed_from: Optional[date] = None,
+    subscribed_to: Optional[date] = None,
+) -> dict:
+    """Search query parameters shared by the HTML and JSON search routes"""
+    if mode == "fulltext" and not has_fulltext:
+        # MATCH() needs the FULLTEXT index; without it (SQLite, or before migration 3) search by prefix
+        mode = "prefix"
+    return {
+        "q": q, "mode": mode, "first_name": first_name, "last_name": last_name,
+        "company": company, "city": city, "country": country, "email": email,
+        "subscribed_from": subscribed_from, "subscribed_to": subscribed_to,
+    }
+
+shared_cache = backend_from_url(os.getenv("CUSTOMER_CACHE_URL"))
+
+# Bumped by every write; see "Rendering cache" below
+data_version = DataVersion(
+    backend=shared_cache,
+    ttl=float(os.getenv("DATA_VERSION_TTL", "1")),
+)
+
+# Single-customer rows for the detail, confirm-delete and failed-update pages.
+# Every worker keeps its own copies in front of the shared backend (if any), so
+# rows are keyed by the data version the workers and replicas share.
+customer_cache = CustomerCache(
+    maxsize=int(os.getenv("CUSTOMER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("CUSTOMER_CACHE_TTL", "60")),
+    backend=shared_cache,
+    version=data_version if shared_cache is not None or data_version.process_shared else None,
+)
+
+async def get_customer(user_id: str):
+    """Fetch one customer row through the read-through cache"""
+    return await customer_cache.get_or_load(
+        user_id,
+        lambda: database.fetch_one(
+            "SELECT * FROM customers WHERE `Customer Id` = %s",
+            (user_id,)
+        ),
+        store=replicas_current(),
+    )
+
+# --- Rendering cache ---
+# Pages are cached per URL, admin flag and data version; update/delete bump the
+# version, so cached pages and ETags never outlive the data they show. Writes
+# made outside the app (e.g. scripts/load_to_rds.py) show up after PAGE_CACHE_TTL.
+page_cache = LRUCache(
+    maxsize=int(os.getenv("PAGE_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("PAGE_CACHE_TTL", "60")),
+)
+# Row HTML keyed by the row's own values, so a changed row simply misses
+row_fragments = LRUCache(
+    maxsize=int(os.getenv("ROW_FRAGMENT_CACHE_SIZE", "20000")),
+    ttl=float(os.getenv("ROW_FRAGMENT_CACHE_TTL", "3600")),
+)
+
+def _template_digest():
+    digest = hashlib.sha256()
+    for name in sorted(templates.env.list_templates()):
+        source, _, _ = templates.env.loader.get_source(templates.env, name)
+        digest.update(name.encode() + b"\0" + source.encode())
+    return digest.hexdigest()[:16]
+
+# Part of every ETag so a deploy with changed templates never answers 304;
+# STARTED_AT does the same for Last-Modified
+TEMPLATE_DIGEST = _template_digest()
+STARTED_AT = time.time()
+
+def render_row(user, is_admin):
+    """One listing row, rendered once per distinct row content"""
+    key = (bool(is_admin),) + tuple(user.get(column) for column in LIST_COLUMNS)
+    html = row_fragments.get(key)
+    if html is None:
+        html = Markup(templates.env.get_template("_customer_row.html").render(user=user, is_admin=is_admin))
+        row_fragments.set(key, html)
+    return html
+
+templates.env.globals["render_row"] = render_row
+stream_templates.globals["render_row"] = render_row
+
+def last_modified(rows, *since):
+    """Newest `updated_at` of ``rows`` (and of any ``since`` timestamps) as an HTTP date
+
+    None when the column is missing, since nothing else tracks row changes.
+    """
+    if not has_updated_at:
+        return None
+    stamps = [to_timestamp(row.get("updated_at")) for row in rows] + list(since)
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return http_date(max(stamps)) if stamps else None
+
+async def cached_page(request: Request, render):
+    """Serve a GET page from the page cache, as a 304, or by calling ``render()``
+
+    The ETag depends only on the URL, the admin flag, the data version and a
+    PAGE_CACHE_TTL time bucket (so writes made outside the app surface
+    within one TTL). A matching If-None-Match is therefore answered without
+    touching the database. ``render()`` may set Last-Modified, which is
+    cached with the body for If-Modified-Since requests.
+    """
+    is_admin = bool(request.session.get("is_admin", False))
+    version = await data_version.get()
+    bucket = int(time.time() // page_cache.ttl) if page_cache.ttl > 0 else 0
+    key = (request.url.path, request.url.query, is_admin, data_version.epoch, version)
+    fingerprint = "|".join(map(str, key + (bucket, TEMPLATE_DIGEST)))
+    etag = 'W/"' + hashlib.sha1(fingerprint.encode()).hexdigest()[:24] + '"'
+    if etag_matches(request.headers, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    entry = page_cache.get(key)
+    if entry is None:
+        current = replicas_current()
+        response = await render()
+        if response.status_code != status.HTTP_200_OK or not current:
+            # Possibly older than the version in the ETag, so neither cached nor validated
+            return response
+        entry = (response.body, response.headers.get("last-modified"))
+        page_cache.set(key, entry)
+
+    body, modified = entry
+    headers = {"ETag": etag}
+    if modified:
+        headers["Last-Modified"] = modified
+        if not_modified_since(request.headers, modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
+async def customer_changed(request: Request, *user_ids: str):
+    """Drop cached copies of customers and everything rendered from the old data"""
+    pin_reads_to_primary(request)
+    await customer_cache.invalidate(*user_ids)
+    await data_version.bump()
+
+# --- Write-behind ---
+# Queued form writes are ("update", UserUpdateForm) or ("delete", None) per Customer Id
+def merge_customer_writes(pending, new):
+    """A later write replaces a pending one, except that nothing revives a deleted row"""
+    return pending if pending[0] == "delete" else new
+
+def apply_customer_writes(cursor, batch: dict):
+    """One UPDATE ... CASE for the queued renames and one DELETE for the queued deletes"""
+    updates = {user_id: form for user_id, (kind, form) in batch.items() if kind == "update"}
+    deletes = [user_id for user_id, (kind, _) in batch.items() if kind == "delete"]
+    if updates:
+        apply_bulk_update(cursor, updates)
+    if deletes:
+        cursor.execute(f"DELETE FROM customers WHERE `Customer Id` IN {in_list(deletes)}", tuple(deletes))
+
+async def flush_customer_writes(batch: dict):
+    """Commit a batch from the write queue, then invalidate caches once for all of it"""
+    await database.transaction(lambda cursor: apply_customer_writes(cursor, batch))
+    await customer_cache.invalidate(*batch)
+    await data_version.bump()
+    if any(kind == "delete" for kind, _ in batch.values()):
+        customer_count.invalidate()
+
+write_queue = WriteQueue(
+    flush_customer_writes, merge=merge_customer_writes, registry=metrics_registry, **write_queue_config
+) if WRITE_BEHIND else None
+
+# --- Streaming Utilities ---
+async def coalesce_chunks(chunks, size=STREAM_CHUNK_BYTES):
+    """Merge small text chunks into ~size-byte writes to avoid tiny HTTP frames"""
+    buffer, buffered = [], 0
+    async for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+async def iter_export_rows():
+    async for batch in database.stream(EXPORT_SELECT, batch_size=EXPORT_BATCH_SIZE):
+        for row in batch:
+            yield row
+
+async def csv_chunks():
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    yield out.getvalue()
+    async for batch in database.stream(EXPORT_SELECT, batch_size=EXPORT_BATCH_SIZE, dictionary=False):
+        out.seek(0)
+        out.truncate()
+        writer.writerows(batch)
+        yield out.getvalue()
+
+async def ndjson_chunks():
+    async for batch in database.stream(EXPORT_SELECT, batch_size=EXPORT_BATCH_SIZE, dictionary=False):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n" for row in batch
+        )
 
 # --- Authentication ---
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(username: str, plain_password: str, client: Optional[str] = None) -> bool:
+    """Verify an admin password without blocking the event loop; ``client`` is throttled on failures for ``username``"""
+    try:
+        return await password_verifier.verify(
+            username, plain_password, ADMIN_CREDENTIALS.get(username), client=client
+        )
+    except TooManyAttempts as e:
+        logger.warning(f"Throttled login attempts for {username} from {client}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except VerifierBusy:
+        logger.warning("Credential verification queue is full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login attempts",
+            headers={"Retry-After": "1"},
+        )
 
 async def authenticate_admin(
+    request: Request,
     credentials: HTTPBasicCredentials = Depends(security)
 ) -> bool:
     """Authenticate admin user"""
     username = credentials.username
     password = credentials.password
     
-    if username in ADMIN_CREDENTIALS and verify_password(
-        password, ADMIN_CREDENTIALS[username]
-    ):
+    if await verify_password(username, password, request.client.host if request.client else None):
         return True
     
     logger.warning(f"Failed login attempt for user: {username}")
@@ -138,61 +898,310 @@ async def authenticate_admin(
         headers={"WWW-Authenticate": "Basic"},
     )
 
+async def require_admin(
+    request: Request,
+    credentials: Optional[HTTPBasicCredentials] = Depends(optional_security)
+) -> bool:
+    """Allow admins logged in through the session or via HTTP Basic credentials"""
+    if request.session.get("is_admin", False):
+        return True
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Admin authentication required",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    return await authenticate_admin(request, credentials)
+
 # --- Routes ---
 @app.get("/", response_class=HTMLResponse)
-async def read_users(request: Request):
-    """Home page showing all users"""
+async def read_users(
+    request: Request,
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    page_size: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Home page showing one keyset-paginated page of users"""
+    async def render():
+        try:
+            users, has_prev, has_next = await fetch_customer_page(after, before, page_size)
+            total = await customer_count.get()
+
+            is_admin = request.session.get("is_admin", False)
+            response = render_template(
+                "index.html",
+                {
+                    "request": request,
+                    "users": users,
+                    "is_admin": is_admin,
+                    "total": total,
+                    "prev_url": page_url("/", page_size, before=users[0]["Index"]) if has_prev and users else None,
+                    "next_url": page_url("/", page_size, after=users[-1]["Index"]) if has_next and users else None,
+                }
+            )
+            # Deletes leave no updated_at behind, so the last app write also counts
+            modified = last_modified(users, data_version.changed_at, STARTED_AT)
+            if modified:
+                response.headers["Last-Modified"] = modified
+            return response
+        except Exception as e:
+            logger.error(f"Error in read_users: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error"
+            )
+
+    return await cached_page(request, render)
+
+@app.get("/search", response_class=HTMLResponse)
+async def search_users(
+    request: Request,
+    filters: dict = Depends(search_filters),
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    page_size: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Listing filtered by name, company, location, email or subscription date"""
     try:
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute("SELECT * FROM customers")
-                users = cursor.fetchall()
-        
+        where, params = build_search_query(filters)
+        users, has_prev, has_next = await fetch_customer_page(
+            after, before, page_size, where=where, params=params
+        )
         is_admin = request.session.get("is_admin", False)
-        return templates.TemplateResponse(
+        return render_template(
             "index.html",
-            {"request": request, "users": users, "is_admin": is_admin}
+            {
+                "request": request,
+                "users": users,
+                "is_admin": is_admin,
+                "filters": filters,
+                "prev_url": page_url("/search", page_size, filters, before=users[0]["Index"]) if has_prev and users else None,
+                "next_url": page_url("/search", page_size, filters, after=users[-1]["Index"]) if has_next and users else None,
+            }
         )
     except Exception as e:
-        logger.error(f"Error in read_users: {str(e)}")
+        logger.error(f"Error in search_users: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
-@app.get("/user/{user_id}", response_class=HTMLResponse)
-async def read_user(request: Request, user_id: str):
-    """View single user details"""
+@app.get("/api/v1/customers/search")
+async def api_search_customers(
+    filters: dict = Depends(search_filters),
+    after: Optional[int] = None,
+    page_size: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """JSON search; follow ``next_after`` to page through results"""
     try:
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute(
-                    "SELECT * FROM customers WHERE `Customer Id` = %s",
-                    (user_id,)
-                )
-                user = cursor.fetchone()
-                
-                if not user:
-                    logger.info(f"Looking up user with Customer Id: {user_id}")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="User not found"
-                    )
-                
-                is_admin = request.session.get("is_admin", False)
-                return templates.TemplateResponse(
-                    "user.html",
-                    {"request": request, "user": user, "is_admin": is_admin}
-                )
+        where, params = build_search_query(filters)
+        rows, _, has_next = await fetch_customer_page(
+            after, None, page_size, where=where, params=params, select=EXPORT_SELECT_BASE
+        )
+        return {
+            "items": jsonable_encoder(rows),
+            "next_after": rows[-1]["Index"] if has_next and rows else None,
+        }
+    except Exception as e:
+        logger.error(f"Error in api_search_customers: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+# --- JSON API ---
+def api_columns(fields):
+    """Validate a field selection against EXPORT_COLUMNS; empty selects every column"""
+    fields = [f.strip() for f in fields or [] if f.strip()]
+    unknown = [f for f in fields if f not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return list(dict.fromkeys(fields)) or list(EXPORT_COLUMNS)
+
+def select_columns(columns, *required):
+    """SELECT of ``columns`` plus any ``required`` key columns the caller needs"""
+    selected = list(dict.fromkeys(list(required) + list(columns)))
+    return "SELECT " + ", ".join(f"`{c}`" for c in selected) + " FROM customers"
+
+def in_list(values) -> str:
+    return "(" + ", ".join(["%s"] * len(values)) + ")"
+
+def apply_bulk_update(cursor, updates: dict):
+    """Rename existing customers with one UPDATE ... CASE; returns the ids that were found
+
+    Runs inside AsyncDatabase.transaction, so the lookup and the update
+    commit together. MySQL locks the matched rows until then.
+    """
+    ids = list(updates)
+    lock = " FOR UPDATE" if DB_DRIVER == "mysql" else ""
+    cursor.execute(f"SELECT `Customer Id` FROM customers WHERE `Customer Id` IN {in_list(ids)}{lock}", tuple(ids))
+    found = list(dict.fromkeys(row["Customer Id"] for row in cursor.fetchall()))
+    if not found:
+        return found
+
+    cases = " ".join(["WHEN %s THEN %s"] * len(found))
+    params = [value for i in found for value in (i, updates[i].first_name)]
+    params += [value for i in found for value in (i, updates[i].last_name)]
+    cursor.execute(
+        f"UPDATE customers SET `First Name` = CASE `Customer Id` {cases} END, "
+        f"`Last Name` = CASE `Customer Id` {cases} END "
+        f"WHERE `Customer Id` IN {in_list(found)}",
+        tuple(params + found)
+    )
+    return found
+
+@app.get("/api/v1/customers")
+async def api_list_customers(
+    fields: Optional[str] = Query(None, description="Comma-separated columns; all columns by default"),
+    after: Optional[int] = None,
+    page_size: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Customers ordered by `Index`; follow ``next_after`` to page through them"""
+    columns = api_columns(fields.split(",") if fields else None)
+    try:
+        rows, _, has_next = await fetch_customer_page(
+            after, None, page_size, select=select_columns(columns, "Index")
+        )
+        return {
+            "items": jsonable_encoder([{c: row[c] for c in columns} for row in rows]),
+            "next_after": rows[-1]["Index"] if has_next and rows else None,
+        }
+    except Exception as e:
+        logger.error(f"Error in api_list_customers: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@app.post("/api/v1/customers/lookup")
+async def api_lookup_customers(body: CustomerLookupRequest):
+    """Fetch many customers by `Customer Id` in one query, in request order"""
+    columns = api_columns(body.fields)
+    ids = list(dict.fromkeys(body.ids))
+    try:
+        rows = await database.fetch_all(
+            select_columns(columns, "Customer Id") + f" WHERE `Customer Id` IN {in_list(ids)}",
+            tuple(ids)
+        )
+        found = {row["Customer Id"]: row for row in rows}
+        return {
+            "items": jsonable_encoder([{c: found[i][c] for c in columns} for i in ids if i in found]),
+            "missing": [i for i in ids if i not in found],
+        }
+    except Exception as e:
+        logger.error(f"Error in api_lookup_customers: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@app.patch("/api/v1/customers")
+async def api_update_customers(request: Request, body: BulkUpdateRequest, _: bool = Depends(require_admin)):
+    """Rename many customers in one transaction; names are validated like the HTML form"""
+    # A repeated id takes its last update, as sequential requests would
+    updates = {update.customer_id: update for update in body.updates}
+    try:
+        found = await database.transaction(lambda cursor: apply_bulk_update(cursor, updates))
+        if found:
+            await customer_changed(request, *found)
+        logger.info(f"Bulk update of {len(updates)} customers, {len(found)} found")
+        return {"updated": len(found), "missing": [i for i in updates if i not in set(found)]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in api_update_customers: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@app.post("/api/v1/customers/delete")
+async def api_delete_customers(request: Request, body: CustomerIdsRequest, _: bool = Depends(require_admin)):
+    """Delete many customers with a single statement"""
+    ids = list(dict.fromkeys(body.ids))
+    try:
+        deleted = await database.execute(
+            f"DELETE FROM customers WHERE `Customer Id` IN {in_list(ids)}",
+            tuple(ids)
+        )
+        await customer_changed(request, *ids)
+        customer_count.invalidate()
+        logger.info(f"Bulk delete of {len(ids)} customers, {deleted} rows removed")
+        return {"deleted": deleted}
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in read_user: {str(e)}")
+        logger.error(f"Error in api_delete_customers: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
+@app.get("/stream", response_class=HTMLResponse)
+async def stream_users(request: Request, _: bool = Depends(require_admin)):
+    """Full customer table rendered and sent as rows are read"""
+    template = stream_templates.get_template("index.html")
+    body = template.generate_async(
+        users=iter_export_rows(),
+        is_admin=True
+    )
+    return StreamingResponse(coalesce_chunks(body), media_type="text/html; charset=utf-8")
+
+@app.get("/export.csv")
+async def export_csv(_: bool = Depends(require_admin)):
+    """Stream the whole customers table as CSV"""
+    return StreamingResponse(
+        coalesce_chunks(csv_chunks()),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="customers.csv"'}
+    )
+
+@app.get("/export.ndjson")
+async def export_ndjson(_: bool = Depends(require_admin)):
+    """Stream the whole customers table as newline-delimited JSON"""
+    return StreamingResponse(
+        coalesce_chunks(ndjson_chunks()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="customers.ndjson"'}
+    )
+
+@app.get("/user/{user_id}", response_class=HTMLResponse)
+async def read_user(request: Request, user_id: str):
+    """View single user details"""
+    async def render():
+        try:
+            user = await get_customer(user_id)
+
+            if not user:
+                logger.info(f"Looking up user with Customer Id: {user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            is_admin = request.session.get("is_admin", False)
+            response = render_template(
+                "user.html",
+                {"request": request, "user": user, "is_admin": is_admin}
+            )
+            modified = last_modified([user], STARTED_AT)
+            if modified:
+                response.headers["Last-Modified"] = modified
+            return response
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error in read_user: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error"
+            )
+
+    return await cached_page(request, render)
+
 @app.post("/user/{user_id}/update")
 async def update_user(
     request: Request,
@@ -204,16 +1213,18 @@ async def update_user(
     try:
         form_data = UserUpdateForm(first_name=first_name, last_name=last_name)
         # If validation passes, proceed with DB update
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute(
-                    """UPDATE customers 
-                    SET `First Name` = %s, `Last Name` = %s 
-                    WHERE `Customer Id` = %s""",
-                    (form_data.first_name, form_data.last_name, user_id)
-                )
-                conn.commit()
-        
+        if write_queue is not None:
+            await write_queue.submit(user_id, ("update", form_data))
+            pin_reads_to_primary(request)
+        else:
+            await database.execute(
+                """UPDATE customers 
+                SET `First Name` = %s, `Last Name` = %s 
+                WHERE `Customer Id` = %s""",
+                (form_data.first_name, form_data.last_name, user_id)
+            )
+            await customer_changed(request, user_id)
+
         return RedirectResponse(
             url=f"/user/{user_id}",
             status_code=status.HTTP_303_SEE_OTHER
@@ -226,13 +1237,10 @@ async def update_user(
         combined_error_msg = "; ".join(error_msgs)
         
         # Reload user data from DB (optional)
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute("SELECT * FROM customers WHERE `Customer Id` = %s", (user_id,))
-                user = cursor.fetchone()
+        user = await get_customer(user_id)
 
         # Return error messages to the template
-        return templates.TemplateResponse(
+        return render_template(
             "user.html",
             {
                 "request": request,
@@ -253,13 +1261,7 @@ async def update_user(
 async def confirm_delete_user(request: Request, user_id: str):
     """Render confirmation page for deleting a user"""
     try:
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute(
-                    "SELECT * FROM customers WHERE `Customer Id` = %s",
-                    (user_id,)
-                )
-                user = cursor.fetchone()
+        user = await get_customer(user_id)
 
         if not user:
             raise HTTPException(
@@ -267,7 +1269,7 @@ async def confirm_delete_user(request: Request, user_id: str):
                 detail="User not found"
             )
 
-        return templates.TemplateResponse(
+        return render_template(
             "confirm_delete.html",
             {"request": request, "user": user}
         )
@@ -284,14 +1286,16 @@ async def delete_user(request: Request, user_id: str):
     try:
         logger.info(f"Attempting to delete user with Customer Id: {user_id}")
 
-        with get_db_connection() as conn:
-            with get_db_cursor(conn) as cursor:
-                cursor.execute(
-                    "DELETE FROM customers WHERE `Customer Id` = %s",
-                    (user_id,)
-                )
-                conn.commit()
-
+        if write_queue is not None:
+            await write_queue.submit(user_id, ("delete", None))
+            pin_reads_to_primary(request)
+        else:
+            await database.execute(
+                "DELETE FROM customers WHERE `Customer Id` = %s",
+                (user_id,)
+            )
+            await customer_changed(request, user_id)
+            customer_count.invalidate()
         logger.info(f"Successfully deleted user with Customer Id: {user_id}")
 
         return RedirectResponse(
@@ -309,7 +1313,7 @@ async def delete_user(request: Request, user_id: str):
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
     """Admin login page"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return render_template("login.html", {"request": request})
 
 @app.post("/login")
 async def perform_login(
@@ -319,16 +1323,14 @@ async def perform_login(
 ):
     """Process admin login"""
     try:
-        if (username in ADMIN_CREDENTIALS and 
-            verify_password(password, ADMIN_CREDENTIALS[username])):
-            
+        if await verify_password(username, password, request.client.host if request.client else None):
             request.session["is_admin"] = True
             return RedirectResponse(
                 url="/",
                 status_code=status.HTTP_303_SEE_OTHER
             )
         
-        return templates.TemplateResponse(
+        return render_template(
             "login.html",
             {
                 "request": request,
@@ -336,6 +1338,8 @@ async def perform_login(
             },
             status_code=status.HTTP_401_UNAUTHORIZED
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in perform_login: {str(e)}")
         raise HTTPException(
@@ -356,6 +1360,138 @@ async def logout(request: Request):
 async def health_check():
     return {"status": "ok"}
 
+# Readiness waits at most this long for a pooled connection; a saturated pool is "not ready"
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "2"))
+
+def check_database():
+    """Round trip on a pooled connection; a connection that fails it is discarded"""
+    conn = db_pool.acquire(timeout=READY_TIMEOUT)
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception:
+        db_pool.release(conn, discard=True)
+        raise
+    db_pool.release(conn)
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: unlike /health, fails while the database pool cannot serve queries"""
+    try:
+        await database.run(check_database)
+        if not schema_detected:
+            await detect_schema()
+        return {"status": "ready", "pool": db_pool.stats()}
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": str(e)},
+            headers={"Retry-After": "5"},
+        )
+
+@app.get("/stats")
+async def stats(_: bool = Depends(require_admin)):
+    """Runtime statistics for capacity tuning; admins only, as they name hosts and clients"""
+    return {
+        "pool": db_pool.stats() if db_pool else None,
+        "replicas": replicas.stats() if replicas else None,
+        "replica_pools": [pool.stats() for pool in replicas.pools] if replicas else None,
+        "customer_cache": customer_cache.stats(),
+        "page_cache": page_cache.stats(),
+        "row_fragments": row_fragments.stats(),
+        "auth": password_verifier.stats(),
+        "write_queue": write_queue.stats() if write_queue else None,
+        "sessions": session_tokens.stats(),
+        "admission": admission.stats(),
+    }
+
+def pool_metric(key):
+    if db_pool is None:
+        return {}
+    pools = [db_pool] + (replicas.pools if replicas else [])
+    return {(pool.name,): pool.stats()[key] for pool in pools}
+
+def _pool_gauge(name, help, key, kind="gauge"):
+    metrics_registry.register(Gauge(name, help, lambda: pool_metric(key), labelnames=("pool",), kind=kind))
+
+_pool_gauge("db_pool_connections_open", "Connections open (idle + in use)", "open")
+_pool_gauge("db_pool_connections_idle", "Idle connections", "idle")
+_pool_gauge("db_pool_connections_in_use", "Connections checked out", "in_use")
+_pool_gauge("db_pool_waiting", "Threads waiting for a connection", "waiting")
+_pool_gauge("db_pool_checkouts_total", "Connection checkouts", "checkouts", kind="counter")
+_pool_gauge("db_pool_checkout_wait_seconds_total", "Time spent waiting for a connection",
+            "checkout_wait_seconds_total", kind="counter")
+_pool_gauge("db_pool_timeouts_total", "Checkouts that timed out", "timeouts", kind="counter")
+
+def replica_metric(key):
+    if replicas is None:
+        return {}
+    return {(replica["name"],): replica[key] for replica in replicas.stats()["replicas"]}
+
+metrics_registry.register(Gauge(
+    "db_replica_up", "1 while reads are routed to the replica",
+    lambda: {labels: int(up) for labels, up in replica_metric("healthy").items()}, labelnames=("pool",)
+))
+metrics_registry.register(Gauge(
+    "db_replica_lag_seconds", "Replication lag at the last health check",
+    lambda: replica_metric("lag_seconds"), labelnames=("pool",)
+))
+metrics_registry.register(Gauge(
+    "db_replica_fallbacks_total", "Reads sent to the primary because no replica was up",
+    lambda: {(): replicas.fallbacks} if replicas else {}, kind="counter"
+))
+
+def cache_metrics(key):
+    return {
+        ("customer",): customer_cache.stats()[key],
+        ("page",): page_cache.stats()[key],
+        ("row_fragment",): row_fragments.stats()[key],
+        ("auth",): password_verifier.stats()["cache"][key],
+    }
+
+metrics_registry.register(Gauge(
+    "cache_hits_total", "Cache hits", lambda: cache_metrics("hits"), labelnames=("cache",), kind="counter"
+))
+metrics_registry.register(Gauge(
+    "cache_misses_total", "Cache misses", lambda: cache_metrics("misses"), labelnames=("cache",), kind="counter"
+))
+metrics_registry.register(Gauge(
+    "cache_entries", "Entries held in the process-local cache", lambda: cache_metrics("size"), labelnames=("cache",)
+))
+
+metrics_registry.register(Gauge(
+    "admission_in_flight", "Requests holding an admission slot", lambda: {(): admission.in_flight}
+))
+metrics_registry.register(Gauge(
+    "admission_waiting", "Requests waiting for an admission slot", lambda: {(): admission.stats()["waiting"]}
+))
+metrics_registry.register(Gauge(
+    "admission_shed_total", "Requests refused by admission control",
+    lambda: {(reason,): count for reason, count in admission.shed.items()}, labelnames=("reason",), kind="counter"
+))
+metrics_registry.register(Gauge(
+    "login_attempts_limited_total", "Password checks refused because the client failed too often",
+    lambda: {(): login_attempts.limited} if login_attempts else {}, kind="counter"
+))
+
+# Port gunicorn.conf.py also binds for /metrics, which is refused on any other; the
+# Service only exposes the app's port, so scrapes come from the cluster network. 0 serves it everywhere.
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint, on METRICS_PORT only"""
+    # The port the connection came in on, which unlike the Host header a client cannot choose
+    server = request.scope.get("server")
+    if METRICS_PORT and (server is None or server[1] != METRICS_PORT):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 # --- Main ---
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import multiprocessing
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+
+class CachedValue:
+    """Single async-loaded value refreshed at most once per ``ttl`` seconds
+
+    Concurrent callers that find the value expired share one reload instead
+    of each hitting the database.
+    """
+
+    def __init__(self, loader, ttl):
+        self._loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if time.monotonic() < self._expires_at:
+            return self._value
+        async with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._value = await self._loader()
+                self._expires_at = time.monotonic() + self.ttl
+        return self._value
+
+    def invalidate(self):
+        self._expires_at = 0.0
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters"""
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# --- Shared backends ---
+class InMemoryBackend:
+    """Process-local stand-in for a shared cache server, for tests and single-pod setups"""
+
+    def __init__(self):
+        self._data = {}  # key -> (expires_at, value)
+
+    async def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    async def set(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def incr(self, key):
+        value = int(await self.get(key) or 0) + 1
+        self._data[key] = (float("inf"), value)
+        return value
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """Shared cache in Redis so every replica sees the same entries and invalidations"""
+
+    def __init__(self, url):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for redis:// cache URLs") from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key):
+        return await self._client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self._client.set(key, value, ex=max(1, int(ttl)))
+
+    async def delete(self, *keys):
+        await self._client.delete(*keys)
+
+    async def incr(self, key):
+        return await self._client.incr(key)
+
+    async def close(self):
+        await self._client.close()
+
+
+def backend_from_url(url):
+    """Build a shared cache backend from a URL; None means process-local only"""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+# Set by share_data_version() in a pre-fork server's master process
+_process_shared_version = None
+
+
+def share_data_version():
+    """Put the data version in shared memory so forked workers see each other's writes
+
+    Call in the master process before workers are forked (gunicorn.conf.py
+    does this); DataVersion objects created afterwards without a backend use it.
+    """
+    global _process_shared_version
+    if _process_shared_version is None:
+        _process_shared_version = (
+            multiprocessing.Value("q", 0),
+            multiprocessing.Value("d", time.time()),
+            secrets.token_hex(8),
+        )
+    return _process_shared_version
+
+
+class DataVersion:
+    """Counter bumped on every write; rendered pages and ETags are keyed by it
+
+    Process-local by default, with a random ``epoch`` so ETags issued before
+    a restart never match. Workers of one server share it through memory
+    when share_data_version() ran before they were forked. With a shared
+    backend the counter lives there and other replicas see a bump within
+    ``ttl`` seconds. ``changed_at`` is the wall-clock time of the last bump
+    (or of startup), used for Last-Modified.
+    """
+
+    def __init__(self, backend=None, key="data_version", ttl=1.0):
+        self.backend = backend
+        self.key = key
+        self.ttl = ttl
+        self.process_shared = _process_shared_version if backend is None else None
+        if backend is not None:
+            self.epoch = "shared"
+        elif self.process_shared is not None:
+            self.epoch = self.process_shared[2]
+        else:
+            self.epoch = secrets.token_hex(8)
+        self.changed_at = time.time()
+        self._value = 0
+        self._expires_at = 0.0
+
+    async def get(self):
+        if self.process_shared is not None:
+            counter, changed_at, _ = self.process_shared
+            self.changed_at = changed_at.value
+            return counter.value
+        if self.backend is None or time.monotonic() < self._expires_at:
+            return self._value
+        self._value = int(await self.backend.get(self.key) or 0)
+        changed_at = await self.backend.get(self.key + ":changed_at")
+        if changed_at is not None:
+            self.changed_at = max(self.changed_at, float(changed_at))
+        self._expires_at = time.monotonic() + self.ttl
+        return self._value
+
+    async def bump(self):
+        self.changed_at = time.time()
+        if self.process_shared is not None:
+            counter, changed_at, _ = self.process_shared
+            with counter.get_lock():
+                counter.value += 1
+                changed_at.value = self.changed_at
+                return counter.value
+        if self.backend is None:
+            self._value += 1
+        else:
+            self._value = int(await self.backend.incr(self.key))
+            await self.backend.set(self.key + ":changed_at", str(self.changed_at), 30 * 86400)
+            self._expires_at = time.monotonic() + self.ttl
+        return self._value
+
+
+def _encode_value(value):
+    # datetime first: it is also a date
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def _decode_value(obj):
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def dump_row(row) -> str:
+    """JSON for a shared backend; dates and datetimes come back as such from load_row()"""
+    return json.dumps(row, default=_encode_value)
+
+
+def load_row(raw):
+    return json.loads(raw, object_hook=_decode_value)
+
+
+class CustomerCache:
+    """Read-through cache of customer rows keyed by `Customer Id`
+
+    Rows live in a per-process LRU/TTL cache. When a shared backend is
+    configured it backs the local cache: a local miss is looked up there and
+    a loaded row is stored in both, so an update or delete handled by one
+    replica invalidates the entry for all of them. Rows are keyed by
+    ``version`` locally and in the backend, and that replica bumps it, so the
+    others stop serving theirs within the version's ttl, and a row another
+    replica loaded before the write can only be stored under the old version.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60.0, backend=None, prefix="customer:", version=None):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+        self.prefix = prefix
+        # DataVersion shared with the other workers or replicas, whose invalidations this one never sees
+        self.version = version
+        # Bumped on every invalidation so a load that raced with a write is not cached
+        self._generation = 0
+        self.backend_hits = 0
+        self.backend_misses = 0
+
+    async def _local_key(self, customer_id):
+        # Keyed by the shared version, so a write in any worker or replica retires everyone's rows
+        if self.version is None:
+            return customer_id
+        return (await self.version.get(), customer_id)
+
+    def _backend_key(self, local_key):
+        if self.version is None:
+            return self.prefix + local_key
+        version, customer_id = local_key
+        return f"{self.prefix}{version}:{customer_id}"
+
+    async def _get(self, local_key):
+        row = self.local.get(local_key)
+        if row is not None or self.backend is None:
+            return row
+        raw = await self.backend.get(self._backend_key(local_key))
+        if raw is None:
+            self.backend_misses += 1
+            return None
+        self.backend_hits += 1
+        row = load_row(raw)
+        self.local.set(local_key, row)
+        return row
+
+    async def _set(self, local_key, row):
+        self.local.set(local_key, row)
+        if self.backend is not None:
+            await self.backend.set(self._backend_key(local_key), dump_row(row), self.local.ttl)
+
+    async def get_or_load(self, customer_id, loader, store=True):
+        """Return the cached row, or call ``loader()`` and cache a non-empty result
+
+        ``store=False`` still serves cached rows but does not keep what the
+        loader returns, e.g. a replica read that may predate a recent write.
+        """
+        # Taken before loading, so a row read across another worker's write lands under the old version
+        local_key = await self._local_key(customer_id)
+        row = await self._get(local_key)
+        if row is not None:
+            return row
+        generation = self._generation
+        row = await loader()
+        if row is not None and store and self._generation == generation:
+            await self._set(local_key, row)
+        return row
+
+    async def invalidate(self, *customer_ids):
+        """Drop cached rows; the shared backend is cleared in one round trip"""
+        self._generation += 1
+        local_keys = [await self._local_key(customer_id) for customer_id in customer_ids]
+        for local_key in local_keys:
+            self.local.delete(local_key)
+        if self.backend is not None and local_keys:
+            await self.backend.delete(*(self._backend_key(local_key) for local_key in local_keys))
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self):
+        stats = self.local.stats()
+        stats["backend"] = type(self.backend).__name__ if self.backend else "local"
+        if self.backend is not None:
+            stats["backend_hits"] = self.backend_hits
+            stats["backend_misses"] = self.backend_misses
+        return stats
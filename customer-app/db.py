@@ -0,0 +1,631 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from metrics import phase
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout"""
+
+
+class PoolClosed(Exception):
+    """Raised when checking out from a pool that has been shut down"""
+
+
+class ConnectionPool:
+    """Thread-safe connection pool with overflow, recycling and pre-ping
+
+    ``connect`` is any zero-argument callable returning a DB-API connection
+    (``mysql.connector.connect`` in production).  Up to ``pool_size``
+    connections are kept idle between requests; up to ``max_overflow`` extra
+    connections are opened under load and closed again when returned.
+    """
+
+    def __init__(self, connect, pool_size=5, max_overflow=10, recycle=3600,
+                 pre_ping=True, timeout=30.0, name="primary"):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at); LIFO keeps hot connections hot
+        self._created_at = {}  # id(conn) -> creation time of checked-out conns
+        self._open = 0  # idle + checked out
+        self._waiting = 0
+        self._closed = False
+
+        # Checkout metrics
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._connect_errors = 0
+
+    @property
+    def capacity(self):
+        return self.pool_size + self.max_overflow
+
+    @property
+    def in_use(self):
+        """Connections currently checked out (unlocked, so approximate)"""
+        return self._open - len(self._idle)
+
+    def _new_connection(self):
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._connect_errors += 1
+            raise
+
+    def _is_stale(self, conn, created_at):
+        if self.recycle and self.recycle > 0 and time.monotonic() - created_at > self.recycle:
+            self._recycled += 1
+            return True
+        if self.pre_ping:
+            try:
+                alive = conn.is_connected()
+            except Exception:
+                alive = False
+            if not alive:
+                self._ping_failures += 1
+                return True
+        return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to ``timeout`` seconds (default: the pool's)"""
+        start = time.monotonic()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = start + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed(f"Connection pool '{self.name}' is closed")
+                if self._idle:
+                    conn, created_at = self._idle.pop()
+                    break
+                if self._open < self.capacity:
+                    self._open += 1
+                    conn, created_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"Timed out after {timeout}s waiting for a connection "
+                        f"from pool '{self.name}' ({self._open} open)"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        # Validation and connecting happen outside the lock; the slot is ours.
+        try:
+            if conn is not None and self._is_stale(conn, created_at):
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._new_connection()
+                created_at = time.monotonic()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._created_at[id(conn)] = created_at
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if ``discard`` is set"""
+        if not discard:
+            try:
+                # End any open transaction so the next borrower does not
+                # inherit a stale REPEATABLE READ snapshot or held locks.
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), time.monotonic())
+            keep = not discard and not self._closed and len(self._idle) < self.pool_size
+            if keep:
+                self._idle.append((conn, created_at))
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and returns it"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def prefill(self):
+        """Open ``pool_size`` connections up front; failures are only logged
+
+        The connections are opened concurrently, so startup waits for one
+        connect round trip (TCP, TLS, auth) instead of ``pool_size`` of them.
+        """
+        if self.pool_size <= 0:
+            return 0
+        opened, errors = [], []
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix=f"{self.name}-prefill") as executor:
+            futures = [executor.submit(self.acquire) for _ in range(self.pool_size)]
+            for future in futures:
+                try:
+                    opened.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        for conn in opened:
+            self.release(conn)
+        if errors:
+            logger.warning(f"Could not prefill pool '{self.name}': {errors[0]}")
+        return len(opened)
+
+    def close(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """Snapshot of pool occupancy and checkout-wait metrics"""
+        with self._cond:
+            return {
+                "name": self.name,
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "checkout_wait_seconds_total": round(self._wait_total, 6),
+                "checkout_wait_seconds_max": round(self._wait_max, 6),
+                "checkout_wait_seconds_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "connect_errors": self._connect_errors,
+            }
+
+
+# --- Read replicas ---
+# True while reads in this context must see the primary (read-your-writes)
+_primary_reads = contextvars.ContextVar("primary_reads", default=False)
+
+
+def reading_from_primary():
+    return _primary_reads.get()
+
+
+@contextmanager
+def primary_reads():
+    """Route reads made inside the block to the primary"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def pin_primary_reads():
+    """Route the remaining reads of the current context (e.g. one request) to the primary"""
+    _primary_reads.set(True)
+
+
+class PrimaryReadsMiddleware:
+    """Pins a session's reads to the primary until the time stored under ``session_key``
+
+    Must sit inside SessionMiddleware. Write handlers store a deadline
+    (``time.time()`` based) there so the pages they redirect to never come
+    from a replica that has not caught up yet.
+    """
+
+    def __init__(self, app, session_key="primary_reads_until"):
+        self.app = app
+        self.session_key = session_key
+
+    async def __call__(self, scope, receive, send):
+        session = scope.get("session") if scope["type"] == "http" else None
+        # Always set and reset, so a pin_primary_reads() in the handler ends with the request
+        token = _primary_reads.set(bool(session) and session.get(self.session_key, 0) > time.time())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _primary_reads.reset(token)
+
+
+class NoReplicaAvailable(Exception):
+    """Raised when every replica is marked down"""
+
+
+class ReplicaSet:
+    """Read replicas, each with its own ConnectionPool, picked round-robin
+
+    A replica that fails to connect, fails a health check or lags more than
+    ``max_lag`` seconds is skipped for ``retry_after`` seconds or until a
+    later check() passes. Checkouts go to the least busy replica that is up
+    and wait there when all are saturated, so load alone never pushes reads
+    to the primary; callers fall back to the primary only when
+    NoReplicaAvailable is raised.
+    """
+
+    def __init__(self, pools, retry_after=30.0, max_lag=None, lag=None):
+        self.pools = list(pools)
+        self.retry_after = retry_after
+        self.max_lag = max_lag
+        # lag(conn) -> seconds behind the primary, or None when unknown
+        self._lag = lag
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = {pool.name: 0.0 for pool in self.pools}
+        self._last_error = {pool.name: None for pool in self.pools}
+        self._last_lag = {pool.name: None for pool in self.pools}
+        self._reads = {pool.name: 0 for pool in self.pools}
+        self.fallbacks = 0
+
+    def _available(self):
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.pools)
+            down = dict(self._down_until)
+        ordered = self.pools[start:] + self.pools[:start]
+        return [pool for pool in ordered if down[pool.name] <= now]
+
+    def mark_down(self, pool, error):
+        with self._lock:
+            if self._down_until[pool.name] <= time.monotonic():
+                logger.warning(f"Replica '{pool.name}' marked down: {error}")
+            self._down_until[pool.name] = time.monotonic() + self.retry_after
+            self._last_error[pool.name] = str(error)
+
+    def _mark_up(self, pool):
+        with self._lock:
+            if self._down_until[pool.name] > 0:
+                logger.info(f"Replica '{pool.name}' is back up")
+            self._down_until[pool.name] = 0.0
+            self._last_error[pool.name] = None
+
+    def acquire(self):
+        """Check out a connection from the least busy healthy replica; returns (pool, conn)"""
+        # sorted() is stable, so the round-robin order breaks ties between idle replicas
+        for pool in sorted(self._available(), key=lambda pool: pool.in_use / pool.capacity):
+            try:
+                conn = pool.acquire()
+            except (PoolTimeout, PoolClosed):
+                raise
+            except Exception as e:
+                self.mark_down(pool, e)
+                continue
+            with self._lock:
+                self._reads[pool.name] += 1
+            return pool, conn
+        with self._lock:
+            self.fallbacks += 1
+        raise NoReplicaAvailable("No read replica is available")
+
+    def check(self, timeout=2.0):
+        """Health-check every replica: a round trip, plus the lag limit when configured"""
+        for pool in self.pools:
+            try:
+                conn = pool.acquire(timeout=timeout)
+            except Exception as e:
+                self.mark_down(pool, e)
+                continue
+            try:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchall()
+                finally:
+                    cursor.close()
+                lag = self._lag(conn) if self._lag else None
+            except Exception as e:
+                pool.release(conn, discard=True)
+                self.mark_down(pool, e)
+                continue
+            pool.release(conn)
+            self._last_lag[pool.name] = lag
+            if self.max_lag is not None and lag is not None and lag > self.max_lag:
+                self.mark_down(pool, f"{lag}s behind the primary (limit {self.max_lag}s)")
+            else:
+                self._mark_up(pool)
+
+    def prefill(self):
+        return sum(pool.prefill() for pool in self.pools)
+
+    def close(self):
+        for pool in self.pools:
+            pool.close()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "fallbacks": self.fallbacks,
+                "replicas": [
+                    {
+                        "name": pool.name,
+                        "healthy": self._down_until[pool.name] <= now,
+                        "reads": self._reads[pool.name],
+                        "lag_seconds": self._last_lag[pool.name],
+                        "last_error": self._last_error[pool.name],
+                    }
+                    for pool in self.pools
+                ],
+            }
+
+
+@contextmanager
+def get_db_cursor(conn, dictionary=True, buffered=True):
+    """Context manager for database cursors"""
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=dictionary, buffered=buffered)
+        yield cursor
+    finally:
+        if cursor:
+            cursor.close()
+
+
+# --- SQLite stand-in ---
+class SQLiteCursor:
+    """The subset of the mysql.connector cursor API the app uses, over sqlite3"""
+
+    def __init__(self, cursor, dictionary):
+        self._cursor = cursor
+        self.dictionary = dictionary
+        self.rowcount = -1
+
+    @staticmethod
+    def _sql(sql):
+        # The app only ever uses %s placeholders; literal % lives in parameters
+        return sql.replace("%s", "?")
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self._sql(sql), tuple(params))
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(self._sql(sql), seq_of_params)
+        self.rowcount = self._cursor.rowcount
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql.connector-compatible connection over a local SQLite file
+
+    Lets the app run against a database seeded by scripts/load_to_rds.py
+    (DATABASE_URL=sqlite:///...) for local development and benchmarks.
+    MySQL-only features such as FULLTEXT search are unavailable.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        # Pooled connections move between executor threads, one borrower at a time
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._closed = False
+
+    def cursor(self, dictionary=False, buffered=True):
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def is_connected(self):
+        return not self._closed
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._closed = True
+        self._conn.close()
+
+
+class AsyncDatabase:
+    """Non-blocking facade over a blocking DB-API driver
+
+    Every call borrows a connection through ``connection`` (a context manager
+    factory, normally wrapping a ConnectionPool) and runs the driver work on a
+    bounded thread pool, so a slow query only occupies a worker thread and
+    never stalls the event loop. Reads (fetch_* and stream) borrow through
+    ``read_connection`` instead when it is given, e.g. to use replicas.
+    """
+
+    def __init__(self, connection, max_workers=10, read_connection=None):
+        self._connection = connection
+        self._read_connection = read_connection or connection
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on the DB executor, preserving contextvars"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(ctx.run, fn, *args))
+
+    def _fetch_all(self, sql, params):
+        with self._read_connection() as conn:
+            with get_db_cursor(conn) as cursor, phase("query"):
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+    def _fetch_one(self, sql, params):
+        with self._read_connection() as conn:
+            with get_db_cursor(conn) as cursor, phase("query"):
+                cursor.execute(sql, params)
+                return cursor.fetchone()
+
+    def _execute(self, sql, params):
+        with self._connection() as conn:
+            with get_db_cursor(conn) as cursor, phase("query"):
+                cursor.execute(sql, params)
+                conn.commit()
+                return cursor.rowcount
+
+    def _execute_many(self, sql, seq_of_params):
+        with self._connection() as conn:
+            with get_db_cursor(conn) as cursor, phase("query"):
+                cursor.executemany(sql, seq_of_params)
+                conn.commit()
+                return cursor.rowcount
+
+    def _transaction(self, fn):
+        with self._connection() as conn:
+            try:
+                with get_db_cursor(conn) as cursor, phase("query"):
+                    result = fn(cursor)
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+
+    async def fetch_all(self, sql, params=()):
+        return await self.run(self._fetch_all, sql, params)
+
+    async def fetch_one(self, sql, params=()):
+        return await self.run(self._fetch_one, sql, params)
+
+    async def execute(self, sql, params=()):
+        """Execute a write statement in its own transaction; returns rowcount"""
+        return await self.run(self._execute, sql, params)
+
+    async def execute_many(self, sql, seq_of_params):
+        """Execute a batched write in a single transaction; returns rowcount"""
+        return await self.run(self._execute_many, sql, list(seq_of_params))
+
+    async def transaction(self, fn):
+        """Run ``fn(cursor)`` on one connection as a single transaction; rolls back on error"""
+        return await self.run(self._transaction, fn)
+
+    async def stream(self, sql, params=(), batch_size=1000, dictionary=True):
+        """Yield result rows in batches from an unbuffered (server-side) cursor
+
+        Only one batch is held in memory at a time. The connection stays
+        checked out until the generator is exhausted or closed. Driver calls
+        are shielded from cancellation (a client that disconnects cancels the
+        response), so the connection is always given back once the call
+        running at that moment has finished.
+        """
+        cm = self._read_connection()
+        job = None
+        conn = cursor = None
+        exhausted = False
+        exc_info = (None, None, None)
+
+        async def step(fn, *args):
+            nonlocal job
+            job = asyncio.ensure_future(self.run(fn, *args))
+            return await asyncio.shield(job)
+
+        try:
+            conn = await step(cm.__enter__)
+            cursor = await step(functools.partial(conn.cursor, dictionary=dictionary, buffered=False))
+            await step(self._timed_query, cursor.execute, sql, params)
+            while True:
+                batch = await step(self._timed_query, cursor.fetchmany, batch_size)
+                if not batch:
+                    exhausted = True
+                    break
+                yield batch
+        except BaseException:
+            exc_info = sys.exc_info()
+            raise
+        finally:
+            await asyncio.shield(self._finish_stream(job, cm, conn, cursor, exhausted, exc_info))
+
+    async def _finish_stream(self, job, cm, conn, cursor, exhausted, exc_info):
+        if job is not None:
+            try:
+                result = await job
+            except Exception:
+                result = None
+            if conn is None:
+                # Cancelled during the checkout: the connection is whatever it returned
+                conn = result
+        if conn is None:
+            return  # the checkout failed; there is nothing to give back
+        await self.run(self._end_stream, cm, conn, cursor, exhausted, exc_info)
+
+    @staticmethod
+    def _timed_query(fn, *args):
+        with phase("query"):
+            return fn(*args)
+
+    @staticmethod
+    def _end_stream(cm, conn, cursor, exhausted, exc_info):
+        if exhausted:
+            cursor.close()
+        else:
+            # An unbuffered result set cannot be abandoned part-way; closing the
+            # connection makes the pool discard it rather than hand it out again.
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing abandoned streaming connection: {e}")
+        # The real exception, so e.g. a replica that failed mid-stream is marked down
+        cm.__exit__(*exc_info)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,103 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    gunicorn backend:app -c gunicorn.conf.py
+
+Every setting can be overridden through the environment (WEB_CONCURRENCY,
+GUNICORN_KEEPALIVE, ...). Each worker opens its own DB pool, so the
+connections a pod can hold are workers * (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW).
+/metrics and /stats describe the worker that served the request; /metrics is
+only served on METRICS_PORT, which stays off the load balancer.
+"""
+import importlib
+import math
+import os
+import secrets
+import sys
+import time
+
+
+def cpu_limit():
+    """CPUs this container may use: the cgroup CPU quota, else the scheduler affinity"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:  # cgroup v2
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:  # cgroup v1
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+# --- Workers ---
+# Async workers: one per core is enough, the event loop multiplexes requests
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or cpu_limit()
+# Picks uvloop and httptools, which uvicorn[standard] installs
+worker_class = "uvicorn.workers.UvicornWorker"
+# Workers import the app themselves, so each builds its pool and executors after the fork
+preload_app = False
+# Third-party imports shared by all workers; see on_starting
+PRELOAD_MODULES = ("fastapi", "fastapi.templating", "fastapi.security", "jinja2", "mysql.connector")
+# Restart workers now and then to bound slow leaks; 0 disables
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+# --- Sockets ---
+bind = [os.getenv("GUNICORN_BIND", "0.0.0.0:8000")]
+# Prometheus scrapes; backend.py reads the same variable and 404s /metrics on other ports
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+if METRICS_PORT:
+    bind.append(f"0.0.0.0:{METRICS_PORT}")
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+# Longer than the load balancer's idle timeout (60s on an ALB), so the proxy
+# always closes idle connections first and never reuses one we just closed
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "75"))
+# Proxies trusted to set X-Forwarded-For. Rate limits key on the client address this
+# yields, so list the load balancer's addresses rather than "*", which lets clients pick their own.
+# uvicorn only matches exact addresses; the app's ForwardedClientMiddleware also accepts networks
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# --- Lifecycle ---
+# Worker heartbeat; uvicorn workers ping from the event loop, so this only trips on a stuck loop
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On SIGTERM workers stop accepting and finish in-flight requests for up to this long;
+# keep it below the pod's terminationGracePeriodSeconds minus the preStop delay
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Master process, before any worker is forked: set up state the workers must share"""
+    if not os.getenv("SESSION_SECRET"):
+        # Otherwise every worker would generate its own key and reject the others' cookies
+        os.environ["SESSION_SECRET"] = secrets.token_urlsafe(32)
+        server.log.warning("SESSION_SECRET is not set; generated one shared by all workers (development only)")
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import cache
+
+    # Without a shared cache server, workers publish writes through shared memory instead
+    if not os.getenv("CUSTOMER_CACHE_URL"):
+        cache.share_data_version()
+
+    # Most of a worker's cold start is importing fastapi (its OpenAPI models alone take
+    # ~0.5s). These libraries open no threads, sockets or files, so import them once
+    # here and let every worker, including ones restarted later, inherit them on fork.
+    # The app itself is still imported per worker (see preload_app).
+    started = time.perf_counter()
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    server.log.info(f"Preloaded {len(PRELOAD_MODULES)} libraries in {time.perf_counter() - started:.2f}s")
+    server.log.info(f"Starting {workers} {worker_class} workers (CPU limit {cpu_limit()})")
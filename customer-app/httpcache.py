@@ -0,0 +1,201 @@
+import zlib
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+# --- Validators ---
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def to_timestamp(value):
+    """DB timestamp (datetime, or its string form from a JSON cache) -> epoch seconds
+
+    Naive values are taken as UTC, which is what RDS and SQLite store.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def etag_matches(headers, etag: str) -> bool:
+    """If-None-Match check with weak comparison, so compressed variants still validate"""
+    header = headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified_since(headers, last_modified: str) -> bool:
+    """If-Modified-Since check; only consulted when the request has no If-None-Match"""
+    header = headers.get("if-modified-since")
+    if not header or "if-none-match" in headers:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+
+
+# --- Cache-Control ---
+class CacheControlMiddleware:
+    """Applies a Cache-Control policy per route template unless the endpoint set one
+
+    Session-dependent policies (``private``) also get ``Vary: Cookie`` so a
+    shared cache never hands one user's page to another.
+    """
+
+    def __init__(self, app, policies, default="no-store"):
+        self.app = app
+        self.policies = policies
+        self.default = default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "cache-control" not in headers:
+                    route = getattr(scope.get("route"), "path", None)
+                    policy = self.policies.get(route, self.default)
+                    headers["Cache-Control"] = policy
+                    if "private" in policy:
+                        headers.add_vary_header("Cookie")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# --- Compression ---
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "image/svg+xml")
+
+
+def accepted_encodings(header: str):
+    """Codings from Accept-Encoding with a non-zero q-value"""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data, final):
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data, final):
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    """gzip / brotli response compression above a size threshold
+
+    Prefers brotli when the optional ``brotli`` package is installed and the
+    client accepts it. Streamed bodies are flushed chunk by chunk so exports
+    and /stream stay incremental. Responses that are already encoded, too
+    small, or not text-like pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder(self, scope):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br", _BrotliEncoder(self.brotli_quality)
+        if "gzip" in accepted:
+            return "gzip", _GzipEncoder(self.gzip_level)
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        encoding, encoder = (None, None)
+        if scope["type"] == "http":
+            encoding, encoder = self._encoder(scope)
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressing = None  # decided on the first body message
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressing
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(scope=start_message)
+                content_type = headers.get("content-type", "")
+                compressing = (
+                    "content-encoding" not in headers
+                    and content_type.startswith(COMPRESSIBLE_TYPES)
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if compressing:
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                    if not more_body:
+                        body = encoder.compress(body, final=True)
+                        headers["Content-Length"] = str(len(body))
+                        await send(start_message)
+                        await send({"type": "http.response.body", "body": body})
+                        return
+                await send(start_message)
+
+            if compressing:
+                message = {
+                    "type": "http.response.body",
+                    "body": encoder.compress(body, final=not more_body),
+                    "more_body": more_body,
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,187 @@
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers cached hits (~1ms) up to pool-timeout stalls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus histogram with a fixed label set"""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labelvalues, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _labels(self.labelnames, labelvalues, [f'le="{_number(bound)}"'])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _labels(self.labelnames, labelvalues, ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{le} {values[-1]}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {round(values[-2], 6)}")
+            lines.append(f"{self.name}_count{labels} {values[-1]}")
+        return lines
+
+
+class Gauge:
+    """Value read from ``collect()`` at scrape time; returns {label values: number}"""
+
+    def __init__(self, name, help, collect, labelnames=(), kind="gauge"):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.collect()
+        except Exception as e:
+            logger.debug(f"Metric collector {self.name} failed: {e}")
+            return lines
+        for labelvalues, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# --- Per-request phase timing ---
+# Holds a list of (phase, seconds) for the current request. AsyncDatabase.run
+# copies the context into its worker threads, so the list is shared with them.
+_phases = contextvars.ContextVar("request_phases", default=None)
+
+
+@contextmanager
+def phase(name):
+    """Attribute the time spent in the block to ``name`` for the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _phases.get()
+        if timings is not None:
+            timings.append((name, time.perf_counter() - start))
+
+
+class RequestMetrics:
+    """Pure ASGI middleware recording per-route latency, phase breakdown and in-flight requests
+
+    Routes are labelled by their path template (``/user/{user_id}``) so label
+    cardinality stays bounded. Requests slower than ``slow_request_ms`` are
+    logged with their phase breakdown; 0 disables the slow log.
+    """
+
+    def __init__(self, app, registry, slow_request_ms=0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.in_flight = 0
+        self.requests = registry.register(Histogram(
+            "http_request_duration_seconds", "Time to fully send the response",
+            ("method", "route", "status"),
+        ))
+        self.phases = registry.register(Histogram(
+            "http_request_phase_seconds", "Time per request spent in each phase",
+            ("route", "phase"),
+        ))
+        registry.register(Gauge(
+            "http_requests_in_progress", "Requests currently being handled",
+            lambda: {(): self.in_flight},
+        ))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        token = _phases.set(timings)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight -= 1
+            _phases.reset(token)
+            self._record(scope, status_code, time.perf_counter() - start, timings)
+
+    def _record(self, scope, status_code, elapsed, timings):
+        route = scope.get("route")
+        route = getattr(route, "path", None) or "unmatched"
+        self.requests.observe(elapsed, scope["method"], route, str(status_code))
+
+        totals = {}
+        for name, seconds in timings:
+            totals[name] = totals.get(name, 0.0) + seconds
+        for name, seconds in totals.items():
+            self.phases.observe(seconds, route, name)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            breakdown = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in totals.items())
+            logger.warning(
+                f"Slow request: {scope['method']} {scope['path']} -> {status_code} "
+                f"in {elapsed * 1000:.1f}ms ({breakdown or 'no phases recorded'})"
+            )
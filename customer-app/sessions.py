@@ -0,0 +1,269 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import secrets
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+
+from cache import LRUCache
+
+# Truncated HMAC-SHA256: 128 bits is plenty for a signature and keeps cookies short
+SIGNATURE_BYTES = 16
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class Session(dict):
+    """Session data that remembers whether the request changed it"""
+
+    modified = False
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
+
+class SessionStore:
+    """Server-side session data: an in-process LRU, optionally over a shared backend
+
+    Without ``backend`` sessions live in this process only, so every request
+    of a session must reach the same worker. With one (see
+    cache.backend_from_url) any worker can serve it; local copies are then
+    kept for ``local_ttl`` seconds, which bounds how long a logout made on
+    another worker takes to be seen here.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600, backend=None, local_ttl=1.0, prefix="session:"):
+        self.ttl = ttl
+        self.backend = backend
+        self.local_ttl = ttl if backend is None else local_ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=self.local_ttl)
+        self.prefix = prefix
+
+    async def get(self, sid):
+        record = self.local.get(sid)
+        if record is None and self.backend is not None:
+            raw = await self.backend.get(self.prefix + sid)
+            if raw is not None:
+                record = json.loads(raw)
+                self.local.set(sid, record)
+        return record
+
+    async def set(self, sid, record):
+        self.local.set(sid, record)
+        if self.backend is not None:
+            await self.backend.set(self.prefix + sid, json.dumps(record, separators=(",", ":")), self.ttl)
+
+    async def delete(self, sid):
+        self.local.delete(sid)
+        if self.backend is not None:
+            await self.backend.delete(self.prefix + sid)
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self):
+        return {"local": self.local.stats(), "backend": type(self.backend).__name__ if self.backend else None}
+
+
+class SessionTokens:
+    """Issues and checks compact session tokens
+
+    Without a store the token carries the data itself,
+    ``<base64 json>.<issued>.<signature>``. With a ``SessionStore`` the
+    token is only ``<random id>.<signature>`` and the data stays on the
+    server, where a logout actually revokes it. Tokens that verified once
+    are kept in an LRU, so later requests skip the HMAC (and the JSON
+    decoding). Either way a session lives ``max_age`` seconds from its last
+    refresh.
+    """
+
+    def __init__(self, secret_key, max_age=3600, store=None, cache_size=10000):
+        # Derived once; itsdangerous derives its key again on every signature check
+        self._key = hashlib.sha256(b"customer-app session\0" + secret_key.encode()).digest()
+        self.max_age = max_age
+        self.store = store
+        # Tokens whose signature checked out: token -> (issued, data), or the session id with a store
+        self._verified = LRUCache(maxsize=cache_size, ttl=max_age)
+        self.decoded = 0
+        self.rejected = 0
+        self.issued = 0
+
+    def _sign(self, message: str) -> str:
+        return _b64encode(hmac.new(self._key, message.encode("ascii"), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+    def _verify(self, token: str):
+        """The signed part of ``token``, or None when the signature does not match"""
+        message, _, signature = token.rpartition(".")
+        # compare_digest only takes ASCII strings; a valid token never has anything else
+        if not message or not token.isascii() or not hmac.compare_digest(self._sign(message), signature):
+            self.rejected += 1
+            return None
+        return message
+
+    async def load(self, token: str):
+        """(issued, data) for a valid, unexpired token, else None"""
+        now = time.time()
+        if self.store is not None:
+            sid = self._verified.get(token)
+            if sid is None:
+                sid = self._verify(token)
+                if sid is None:
+                    return None
+                self._verified.set(token, sid)
+            record = await self.store.get(sid)
+            if record is None or record["issued"] + self.max_age <= now:
+                return None
+            return record["issued"], record["data"]
+
+        cached = self._verified.get(token)
+        if cached is not None:
+            return cached if cached[0] + self.max_age > now else None
+        message = self._verify(token)
+        if message is None:
+            return None
+        body, _, issued = message.rpartition(".")
+        try:
+            issued = int(issued)
+            data = json.loads(_b64decode(body))
+        except (ValueError, binascii.Error):
+            self.rejected += 1
+            return None
+        self.decoded += 1
+        if issued + self.max_age <= now:
+            return None
+        # Only verified tokens are cached; the entry expires with the token
+        self._verified.set(token, (issued, data), ttl=issued + self.max_age - now)
+        return issued, data
+
+    async def save(self, token, data: dict, rotate: bool) -> str:
+        """Token for ``data``, replacing ``token``; ``rotate`` forces a new session id"""
+        issued = int(time.time())
+        self.issued += 1
+        if self.store is None:
+            body = _b64encode(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+            message = f"{body}.{issued}"
+            return f"{message}.{self._sign(message)}"
+
+        sid = None if rotate or token is None else self._verify(token)
+        if sid is None:
+            if token is not None:
+                await self.discard(token)
+            sid = secrets.token_urlsafe(18)
+        await self.store.set(sid, {"issued": issued, "data": dict(data)})
+        return f"{sid}.{self._sign(sid)}"
+
+    async def discard(self, token):
+        """Forget the server-side data behind ``token``, if any"""
+        self._verified.delete(token)
+        if self.store is not None:
+            sid = self._verify(token)
+            if sid:
+                await self.store.delete(sid)
+
+    def stats(self):
+        return {
+            "mode": "cookie" if self.store is None else "store",
+            "max_age": self.max_age,
+            "decoded": self.decoded,
+            "rejected": self.rejected,
+            "issued": self.issued,
+            "verified_cache": self._verified.stats(),
+            "store": self.store.stats() if self.store is not None else None,
+        }
+
+
+class SessionMiddleware:
+    """Drop-in for Starlette's SessionMiddleware, built on SessionTokens
+
+    Requests without the cookie get an empty session with no parsing or
+    crypto at all. The cookie is only sent back when the handler changed the
+    session, or when more than ``refresh_after`` of its lifetime has passed
+    (so active sessions keep sliding forward), instead of being re-signed on
+    every response. A session that starts empty and gets data, e.g. at
+    login, always gets a fresh id.
+    """
+
+    def __init__(self, app, tokens, session_cookie="session", path="/", same_site="lax",
+                 https_only=False, refresh_after=0.5):
+        self.app = app
+        self.tokens = tokens
+        self.session_cookie = session_cookie
+        self._marker = session_cookie.encode("latin-1") + b"="
+        self.path = path
+        self.flags = f"httponly; samesite={same_site}" + ("; secure" if https_only else "")
+        self.refresh_after = tokens.max_age * refresh_after
+
+    def _token(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"cookie" and self._marker in value:
+                return cookie_parser(value.decode("latin-1")).get(self.session_cookie)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        token = self._token(scope)
+        loaded = await self.tokens.load(token) if token else None
+        issued, data = loaded if loaded else (None, {})
+        session = scope["session"] = Session(data)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                cookie = None
+                if session.modified or (session and time.time() - issued > self.refresh_after):
+                    if session:
+                        new_token = await self.tokens.save(token if loaded else None, session, rotate=not data)
+                        cookie = (
+                            f"{self.session_cookie}={new_token}; path={self.path}; "
+                            f"Max-Age={self.tokens.max_age}; {self.flags}"
+                        )
+                    elif token:
+                        await self.tokens.discard(token)
+                        cookie = (
+                            f"{self.session_cookie}=null; path={self.path}; "
+                            f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.flags}"
+                        )
+                if cookie:
+                    MutableHeaders(scope=message).append("Set-Cookie", cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,121 @@
+import re
+from datetime import date
+from typing import NamedTuple, Pattern
+
+# Compiled once at import; used both per record (the update form) and per
+# column (loader chunks via pandas' vectorized string methods).
+NAME_PATTERN = re.compile(r"[A-Za-z\s'-]+")
+CUSTOMER_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+INDEX_PATTERN = re.compile(r"\d+")
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}")
+# Digits with the usual separators, an optional leading +, and an optional extension
+PHONE_PATTERN = re.compile(r"\+?[0-9().\- ]{7,25}(?:\s*(?:x|ext\.?)\s*\d{1,6})?", re.IGNORECASE)
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+URL_PATTERN = re.compile(r"https?://[^\s/$.?#][^\s]*", re.IGNORECASE)
+
+
+class Rule(NamedTuple):
+    pattern: Pattern
+    max_length: int
+    min_length: int = 0
+    required: bool = False
+
+
+# Input column -> rule; columns not listed are loaded unchecked
+CUSTOMER_RULES = {
+    "Index": Rule(INDEX_PATTERN, 18, required=True),
+    "Customer Id": Rule(CUSTOMER_ID_PATTERN, 64, required=True),
+    "First Name": Rule(NAME_PATTERN, 50, min_length=2, required=True),
+    "Last Name": Rule(NAME_PATTERN, 50, min_length=2, required=True),
+    "Email": Rule(EMAIL_PATTERN, 254),
+    "Phone 1": Rule(PHONE_PATTERN, 40),
+    "Phone 2": Rule(PHONE_PATTERN, 40),
+    "Subscription Date": Rule(DATE_PATTERN, 10),
+    "Website": Rule(URL_PATTERN, 2048),
+}
+DATE_COLUMNS = {"Subscription Date"}
+
+
+# --- Single record ---
+def clean_name(value: str, label: str) -> str:
+    """Trimmed name, or ValueError with the message shown on the update form"""
+    value = value.strip()
+    rule = CUSTOMER_RULES["First Name"]
+    if len(value) < rule.min_length or len(value) > rule.max_length:
+        raise ValueError(f"{label} must be between {rule.min_length} and {rule.max_length} characters")
+    if not NAME_PATTERN.fullmatch(value):
+        raise ValueError(f"{label} must contain only alphabets, spaces, apostrophes, or hyphens")
+    return value
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def validate_record(record: dict, rules=CUSTOMER_RULES) -> list:
+    """Rejection reasons for one row of raw text values; empty when the row is valid"""
+    reasons = []
+    for column, rule in rules.items():
+        if column not in record:
+            continue
+        value = record[column]
+        value = "" if value is None else str(value).strip()
+        if not value:
+            if rule.required:
+                reasons.append(f"{column} is required")
+        elif len(value) > rule.max_length:
+            reasons.append(f"{column} is longer than {rule.max_length} characters")
+        elif len(value) < rule.min_length:
+            reasons.append(f"{column} is shorter than {rule.min_length} characters")
+        elif not rule.pattern.fullmatch(value) or (column in DATE_COLUMNS and not _is_date(value)):
+            reasons.append(f"invalid {column}")
+    return reasons
+
+
+# --- Batches ---
+def validate_frame(df, rules=CUSTOMER_RULES):
+    """Rejection reasons for every row of a DataFrame, as a string Series ("" when valid)
+
+    Each column costs one strip, one length and one full-match call over the
+    whole chunk; the masks are combined in numpy and reason strings are only
+    built for the rejected rows. Produces the same reasons as validate_record.
+    """
+    import numpy as np
+    import pandas as pd
+
+    failures = []  # (row mask, reason) in validate_record's order
+    for column, rule in rules.items():
+        if column not in df:
+            continue
+        values = df[column]
+        if not isinstance(values.dtype, pd.StringDtype):
+            values = values.astype("string")
+        values = values.str.strip()
+        lengths = values.str.len().to_numpy(dtype=np.int64, na_value=0)
+        present = lengths > 0
+        too_long = lengths > rule.max_length
+        too_short = present & ~too_long & (lengths < rule.min_length)
+        checked = present & ~too_long & ~too_short
+        invalid = checked & ~values.str.fullmatch(rule.pattern).to_numpy(dtype=bool, na_value=False)
+        if column in DATE_COLUMNS and (checked & ~invalid).any():
+            parsed = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
+            invalid |= checked & parsed.isna().to_numpy()
+
+        if rule.required:
+            failures.append((~present, f"{column} is required"))
+        failures.append((too_long, f"{column} is longer than {rule.max_length} characters"))
+        failures.append((too_short, f"{column} is shorter than {rule.min_length} characters"))
+        failures.append((invalid, f"invalid {column}"))
+
+    reasons = np.full(len(df), "", dtype=object)
+    failures = [(mask, message) for mask, message in failures if mask.any()]
+    if failures:
+        rejected = np.logical_or.reduce([mask for mask, _ in failures])
+        for row in np.flatnonzero(rejected):
+            reasons[row] = "; ".join(message for mask, message in failures if mask[row])
+    return pd.Series(reasons, index=df.index, dtype=object)
+
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+
+from metrics import Gauge, Histogram, phase
+
+logger = logging.getLogger(__name__)
+
+# Mutations per group commit
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def last_write_wins(pending, new):
+    return new
+
+
+class WriteQueue:
+    """Write-behind queue that coalesces mutations per key and commits them in groups
+
+    ``submit(key, op)`` returns once the batch holding ``op`` has been
+    committed by ``flush(batch)``, an async callable taking {key: op}, so a
+    caller can acknowledge the write as durable. Batches are flushed when
+    ``max_batch`` keys are pending or ``max_delay`` seconds after the first
+    one, one at a time in submission order; writes arriving while a batch
+    commits form the next one. A second op for a key that is still pending
+    replaces it through ``merge(pending, new)``. When a batch fails, its
+    keys are retried one by one so only the failing key's callers see the
+    error.
+    """
+
+    def __init__(self, flush, max_batch=100, max_delay=0.005, merge=last_write_wins,
+                 registry=None, name="customers"):
+        self._flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._merge = merge
+        self.name = name
+        self._pending = {}  # key -> op, in first-submission order
+        self._waiters = {}  # key -> [futures]
+        self._timer = None
+        self._tasks = set()
+        self._lock = asyncio.Lock()  # one commit at a time, in order
+        self._closed = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batch_sizes = Histogram(
+            "db_write_batch_size", "Mutations committed per group commit", ("queue",), buckets=BATCH_SIZE_BUCKETS,
+        )
+        self.flush_seconds = Histogram(
+            "db_write_flush_seconds", "Time to commit one batch", ("queue",),
+        )
+        if registry is not None:
+            registry.register(self.batch_sizes)
+            registry.register(self.flush_seconds)
+            registry.register(Gauge(
+                "db_write_queue_depth", "Mutations waiting for the next group commit",
+                lambda: {(self.name,): len(self._pending)}, labelnames=("queue",),
+            ))
+            registry.register(Gauge(
+                "db_writes_coalesced_total", "Mutations replaced by a later one for the same key",
+                lambda: {(self.name,): self.coalesced}, labelnames=("queue",), kind="counter",
+            ))
+
+    async def submit(self, key, op):
+        """Queue ``op`` for ``key`` and wait until it has been committed"""
+        if self._closed:
+            raise RuntimeError(f"Write queue '{self.name}' is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key in self._pending:
+            self._pending[key] = self._merge(self._pending[key], op)
+            self.coalesced += 1
+        else:
+            self._pending[key] = op
+        self._waiters.setdefault(key, []).append(future)
+        self.submitted += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+        with phase("write_queue"):
+            # Shielded, so a client that disconnects does not cancel other callers' batch
+            return await asyncio.shield(future)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, {}
+        task = asyncio.ensure_future(self._commit(batch, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _commit(self, batch, waiters):
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                result = await self._flush(batch)
+                self._resolve(batch, waiters, result=result)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._resolve(batch, waiters, error=e)
+                else:
+                    logger.warning(f"Group commit of {len(batch)} writes failed ({e}); retrying them one by one")
+                    for key, op in batch.items():
+                        try:
+                            result = await self._flush({key: op})
+                            self._resolve({key: op}, waiters, result=result)
+                        except Exception as key_error:
+                            self._resolve({key: op}, waiters, error=key_error)
+            finally:
+                self.batch_sizes.observe(len(batch), self.name)
+                self.flush_seconds.observe(time.perf_counter() - start, self.name)
+
+    def _resolve(self, batch, waiters, result=None, error=None):
+        if error is None:
+            self.flushed += len(batch)
+        else:
+            self.failed += len(batch)
+        for key in batch:
+            for future in waiters.get(key, ()):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    async def close(self):
+        """Commit whatever is pending and refuse further writes"""
+        self._closed = True
+        self._start_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "max_batch": self.max_batch,
+            "max_delay": self.max_delay,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "in_flight_batches": len(self._tasks),
+        }
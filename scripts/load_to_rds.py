@@ -151,10 +151,26 @@ import sys
 import boto3
 import json
 import time
+import csv
+import argparse
+import resource
+import queue
+import threading
+import hashlib
+import itertools
+import glob
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
 load_dotenv()  # This loads .env values into os.environ
 
+# Row rules are shared with the app's update form
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "customer-app"))
+import validation
+from schema import CUSTOMER_KEY, migrate
+
 
 # Configure logging
 logging.basicConfig(
@@ -196,6 +212,10 @@ class RDSConnectionManager:
     
     def get_rds_config(self):
         """Get validated RDS configuration with fallbacks"""
+        # Local MySQL / SQLite stand-in for benchmarks and development
+        if os.getenv("DATABASE_URL"):
+            return {"url": os.getenv("DATABASE_URL")}
+
         try:
             config = {
                 "host": os.getenv("DB_HOST"),
@@ -228,15 +248,23 @@ class RDSConnectionManager:
             logger.error(f"Configuration error: {str(e)}")
             raise
     
-    def create_engine(self, config):
+    def create_engine(self, config, local_infile=False, pool_size=5, max_overflow=10):
         """Create SQLAlchemy engine with robust error handling"""
-        connection_string = (
+        connection_string = config.get("url") or (
             f"mysql+pymysql://{quote_plus(config['username'])}:{quote_plus(config['password'])}"
             f"@{config['host']}:{config['port']}/{config['db_name']}"
             "?charset=utf8mb4"
             "&connect_timeout=10"
             #"&ssl_ca={config['ssl_ca']}"
         )
+
+        engine_options = {}
+        if connection_string.startswith("mysql"):
+            connect_args = {"ssl": {"ssl_disabled": True}}
+            if local_infile:
+                # Client-side opt-in needed for LOAD DATA LOCAL INFILE
+                connect_args["local_infile"] = True
+            engine_options["connect_args"] = connect_args
         
         for attempt in range(self.max_retries):
             try:
@@ -244,10 +272,10 @@ class RDSConnectionManager:
                     connection_string,
                     pool_pre_ping=True,
                     pool_recycle=3600,
-                    pool_size=5,
-                    max_overflow=10,
+                    pool_size=pool_size,
+                    max_overflow=max_overflow,
                     echo=False,
-                    connect_args={"ssl": {"ssl_disabled": True}}
+                    **engine_options
                 )
                 
                 # Test connection
@@ -263,7 +291,874 @@ class RDSConnectionManager:
                     raise
                 time.sleep(self.retry_delay * (attempt + 1))
 
-def load_data_to_rds():
+# --- Bulk load strategies ---
+LOAD_STRATEGIES = ("to_sql", "executemany", "load_data", "parallel")
+
+def peak_rss_mb():
+    """Peak resident memory of this process or any finished worker, in MB"""
+    # ru_maxrss is reported in KiB on Linux
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return round(peak / 1024, 1)
+
+def read_csv_header(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+def insert_statement(engine, columns, table="customers"):
+    quote = engine.dialect.identifier_preparer.quote
+    marker = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    return (
+        f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+        f"VALUES ({', '.join([marker] * len(columns))})"
+    )
+
+def frame_to_rows(df):
+    """DataFrame -> list of tuples with NaN as None, ready for executemany"""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+def chunked(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# --- Upserts, checkpoints and change detection ---
+LOAD_MODES = ("append", "upsert", "incremental")
+CHECKPOINT_TABLE = "load_checkpoints"
+ROW_HASH_TABLE = "customer_row_hashes"
+
+def upsert_statement(engine, columns, table="customers", key=CUSTOMER_KEY):
+    """INSERT that updates the existing row when ``key`` already exists"""
+    quote = engine.dialect.identifier_preparer.quote
+    updates = [c for c in columns if c != key]
+    sql = insert_statement(engine, columns, table)
+    if engine.dialect.name == "mysql":
+        return sql + " ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{quote(c)} = VALUES({quote(c)})" for c in updates
+        )
+    return sql + f" ON CONFLICT ({quote(key)}) DO UPDATE SET " + ", ".join(
+        f"{quote(c)} = excluded.{quote(c)}" for c in updates
+    )
+
+def ensure_load_tables(engine):
+    """Bookkeeping tables for resumable and incremental loads (portable DDL)"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+            "source VARCHAR(255) NOT NULL PRIMARY KEY, "
+            "fingerprint VARCHAR(64) NOT NULL, "
+            "rows_committed BIGINT NOT NULL, "
+            "completed INTEGER NOT NULL DEFAULT 0, "
+            "updated_at VARCHAR(32))"
+        ))
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {ROW_HASH_TABLE} ("
+            "customer_id VARCHAR(64) NOT NULL PRIMARY KEY, "
+            "row_hash CHAR(32) NOT NULL)"
+        ))
+
+def file_fingerprint(path):
+    """Cheap identity for an input file: size plus a hash of its head and tail"""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(65536))
+        if size > 65536:
+            f.seek(max(65536, size - 65536))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def read_checkpoint(engine, source, fingerprint):
+    """Rows already committed for ``source``, and whether that load finished
+
+    A checkpoint for a different version of the file is ignored.
+    """
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(f"SELECT fingerprint, rows_committed, completed FROM {CHECKPOINT_TABLE} WHERE source = :source"),
+            {"source": source}
+        ).fetchone()
+    if row is None or row[0] != fingerprint:
+        return 0, False
+    return row[1], bool(row[2])
+
+def row_hash(row):
+    return hashlib.md5(
+        "\x1f".join("" if value is None else str(value) for value in row).encode("utf-8")
+    ).hexdigest()
+
+class BatchWriter:
+    """Writes row batches over one raw DB-API connection
+
+    Modes: ``append`` inserts every row, ``upsert`` inserts or updates by
+    `Customer Id`, ``incremental`` upserts only rows whose content hash
+    changed since the last load. When a checkpoint source is given, the
+    running row count is saved in the same transaction as each batch, so an
+    interrupted load can resume after the last committed batch.
+    """
+
+    def __init__(self, engine, columns, mode="append", checkpoint=None, resume_from=0, table="customers",
+                 progress=None):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode '{mode}', expected one of {LOAD_MODES}")
+        self.engine = engine
+        self.mode = mode
+        self.sql = insert_statement(engine, columns, table) if mode == "append" else upsert_statement(engine, columns, table)
+        self.key_index = columns.index(CUSTOMER_KEY)
+        self.checkpoint = checkpoint  # (source, fingerprint) or None
+        self.rows_committed = resume_from
+        self.rows_read = 0
+        self.rows_written = 0
+        self.progress = progress  # called with (rows_read, rows_written, rows_rejected) after each commit
+
+        self.marker = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+        self.checkpoint_sql = upsert_statement(
+            engine, ["source", "fingerprint", "rows_committed", "completed", "updated_at"], CHECKPOINT_TABLE, "source"
+        )
+        self.hash_sql = upsert_statement(engine, ["customer_id", "row_hash"], ROW_HASH_TABLE, "customer_id")
+
+        self.raw = engine.raw_connection()
+        self.cursor = self.raw.cursor()
+
+    def _changed_rows(self, batch):
+        hashes = {row[self.key_index]: row_hash(row) for row in batch}
+        known = {}
+        ids = list(hashes)
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            self.cursor.execute(
+                f"SELECT customer_id, row_hash FROM {ROW_HASH_TABLE} "
+                f"WHERE customer_id IN ({', '.join([self.marker] * len(part))})",
+                part
+            )
+            known.update(self.cursor.fetchall())
+        changed = [row for row in batch if known.get(row[self.key_index]) != hashes[row[self.key_index]]]
+        return changed, [(row[self.key_index], hashes[row[self.key_index]]) for row in changed]
+
+    def _save_checkpoint(self, completed=False):
+        source, fingerprint = self.checkpoint
+        self.cursor.execute(self.checkpoint_sql, (
+            source, fingerprint, self.rows_committed, int(completed),
+            time.strftime("%Y-%m-%dT%H:%M:%S"),
+        ))
+
+    def write(self, batch):
+        """Write one batch and commit it together with its checkpoint"""
+        rows, hash_rows = batch, None
+        if self.mode == "incremental":
+            rows, hash_rows = self._changed_rows(batch)
+        if rows:
+            # pymysql rewrites this into a single multi-row statement per batch
+            self.cursor.executemany(self.sql, rows)
+        if hash_rows:
+            self.cursor.executemany(self.hash_sql, hash_rows)
+        # Rejected rows were consumed from the source, so they count towards the checkpoint
+        rejected = getattr(batch, "rejected", 0)
+        self.rows_read += len(batch) + rejected
+        self.rows_written += len(rows)
+        self.rows_committed += len(batch) + rejected
+        if self.checkpoint:
+            self._save_checkpoint()
+        self.raw.commit()
+        if self.progress:
+            self.progress(len(batch) + rejected, len(rows), rejected)
+
+    def finish(self):
+        if self.checkpoint:
+            self._save_checkpoint(completed=True)
+            self.raw.commit()
+
+    def close(self):
+        try:
+            self.cursor.close()
+        finally:
+            self.raw.close()
+
+def write_batches(engine, batches, columns, mode="append", checkpoint=None, resume_from=0, progress=None):
+    """Drain ``batches`` through a BatchWriter; returns (rows_read, rows_written)"""
+    writer = BatchWriter(engine, columns, mode, checkpoint, resume_from, progress=progress)
+    try:
+        for batch in batches:
+            writer.write(batch)
+        writer.finish()
+        return writer.rows_read, writer.rows_written
+    finally:
+        writer.close()
+
+# --- Validation and rejects ---
+REJECT_REASON = "Reject Reason"
+
+class RowBatch(list):
+    """Rows ready for executemany, plus how many source rows were rejected to produce them"""
+
+    def __init__(self, rows, rejected=0):
+        super().__init__(rows)
+        self.rejected = rejected
+
+class RejectWriter:
+    """Appends rejected rows and their reasons to a CSV side file
+
+    The file is only created once something is rejected. Thread-safe, since
+    batches are validated on a pipeline thread.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.rows = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, frame):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                header = not (self.append and os.path.exists(self.path) and os.path.getsize(self.path))
+                self._file = open(self.path, "a" if self.append else "w", newline='', encoding='utf-8')
+                if header:
+                    csv.writer(self._file).writerow(list(frame.columns))
+            frame.to_csv(self._file, header=False, index=False)
+            self.rows += len(frame)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            logger.warning(f"Rejected {self.rows} rows; see {self.path}")
+
+def reject_path(rejects_dir, path, part=None):
+    """Side file for rows rejected from ``path`` (or from one partition of it)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(rejects_dir, f"{stem}{f'.{part}' if part else ''}.rejects.csv")
+
+def open_rejects(rejects_dir, path, resumed, part=None):
+    """RejectWriter for ``path``, or None when validation is disabled"""
+    if rejects_dir is None:
+        return None
+    return RejectWriter(reject_path(rejects_dir, path, part), append=resumed)
+
+def divert_rejects(frame, rejects):
+    """Validate ``frame`` and write invalid rows to ``rejects``; returns the boolean mask of valid rows"""
+    reasons = validation.validate_frame(frame)
+    invalid = (reasons != "").to_numpy()
+    if invalid.any():
+        rejects.write(frame[invalid].assign(**{REJECT_REASON: reasons[invalid]}))
+    return ~invalid
+
+def prepare_chunk(chunk, rejects=None):
+    """Validate a raw text chunk, divert invalid rows to ``rejects`` and normalize the rest"""
+    if rejects is None:
+        return RowBatch(frame_to_rows(normalize_chunk(chunk)))
+    valid = divert_rejects(chunk, rejects)
+    return RowBatch(frame_to_rows(normalize_chunk(chunk[valid])), int((~valid).sum()))
+
+def prepare_batch(batch, rejects=None):
+    """prepare_chunk for Arrow record batches; only rejected rows are converted back to text"""
+    if rejects is None:
+        return RowBatch(batch_to_rows(normalize_batch(batch)))
+    pa, _ = import_pyarrow()
+    valid = divert_rejects(batch.to_pandas(), rejects)
+    if not valid.all():
+        batch = batch.filter(pa.array(valid))
+    return RowBatch(batch_to_rows(normalize_batch(batch)), int((~valid).sum()))
+
+# --- Streaming ingestion pipeline ---
+_DONE = object()
+
+def pipelined(iterable, fn, queue_size=4, name="stage"):
+    """Run ``fn`` over ``iterable`` on a background thread, yielding results in order
+
+    Results pass through a queue of at most ``queue_size`` items, so a slow
+    consumer applies backpressure instead of letting memory grow. Chaining
+    stages lets reading, transforming and writing overlap.
+    """
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in iterable:
+                if not put((True, fn(item))):
+                    break
+            else:
+                put((False, _DONE))
+        except BaseException as e:
+            put((False, e))
+        finally:
+            close = getattr(iterable, "close", None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=worker, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, item = results.get()
+            if ok:
+                yield item
+            elif item is _DONE:
+                return
+            else:
+                raise item
+    finally:
+        stop.set()
+        thread.join()
+
+def clean_phone(series):
+    """Trim and collapse internal whitespace; formatting and extensions are kept"""
+    return series.str.strip().str.replace(r"\s+", " ", regex=True)
+
+def normalize_chunk(df):
+    """Type and clean one chunk of customer rows"""
+    df = df.copy()
+    for column in df.columns:
+        if column == "Index":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        else:
+            df[column] = df[column].astype("string").str.strip().replace("", pd.NA)
+    if "Email" in df:
+        df["Email"] = df["Email"].str.lower()
+    for column in ("Phone 1", "Phone 2"):
+        if column in df:
+            df[column] = clean_phone(df[column])
+    if "Subscription Date" in df:
+        df["Subscription Date"] = pd.to_datetime(
+            df["Subscription Date"], format="%Y-%m-%d", errors="coerce"
+        ).dt.date
+    return df
+
+def read_csv_chunks(csv_path, batch_size, skip_rows=0):
+    # Everything as text; normalize_chunk applies the real column types
+    return pd.read_csv(
+        csv_path, chunksize=batch_size, dtype=str, keep_default_na=False,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None
+    )
+
+def stream_csv_batches(csv_path, batch_size, queue_size=4, skip_rows=0, rejects=None):
+    """Yield normalized row batches, with reading and validating/normalizing on their own threads"""
+    chunks = pipelined(read_csv_chunks(csv_path, batch_size, skip_rows), lambda chunk: chunk,
+                       queue_size=queue_size, name="csv-reader")
+    return pipelined(chunks, lambda chunk: prepare_chunk(chunk, rejects),
+                     queue_size=queue_size, name="normalizer")
+
+def load_with_to_sql(engine, csv_path, batch_size, rejects_dir=None):
+    """Original path: whole file into pandas, then DataFrame.to_sql; returns (rows_read, rows_written)"""
+    df = read_input_frame(csv_path)
+    rows = len(df)
+    rejects = open_rejects(rejects_dir, csv_path, resumed=False)
+    if rejects is not None:
+        try:
+            df = df[divert_rejects(df, rejects)]
+        finally:
+            rejects.close()
+    df.to_sql(
+        name='customers',
+        con=engine,
+        if_exists='append',
+        index=False,
+        chunksize=batch_size,
+        method='multi'
+    )
+    return rows, len(df)
+
+def load_with_executemany(engine, csv_path, batch_size, queue_size=4, mode="append", restart=False,
+                          progress=None, rejects_dir=None):
+    """Stream batch_size-row chunks through the pipeline and executemany each batch
+
+    Memory stays bounded by the queue sizes regardless of file size. Resumes
+    after the last committed batch of an earlier, interrupted run.
+    """
+    columns = read_input_header(csv_path)
+    source = os.path.abspath(csv_path)
+    fingerprint = file_fingerprint(csv_path)
+    committed, completed = (0, False) if restart else read_checkpoint(engine, source, fingerprint)
+    if completed:
+        logger.info(f"{csv_path} was already loaded completely; use --restart to load it again")
+        return 0, 0
+    if committed:
+        logger.info(f"Resuming {csv_path} after {committed} committed rows")
+
+    rejects = open_rejects(rejects_dir, csv_path, resumed=committed > 0)
+    try:
+        batches = stream_input_batches(csv_path, batch_size, queue_size, skip_rows=committed, rejects=rejects)
+        return write_batches(engine, batches, columns, mode, (source, fingerprint), committed, progress)
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+def load_with_load_data(engine, csv_path, mode="append"):
+    """Hand the file to MySQL's LOAD DATA LOCAL INFILE; the server does the parsing"""
+    if engine.dialect.name != "mysql":
+        raise ValueError("The load_data strategy requires MySQL")
+    if mode == "incremental":
+        raise ValueError("The load_data strategy does not support incremental mode")
+    if input_format(csv_path) != "csv":
+        # The server only parses text; Arrow writes the CSV without touching Python objects
+        with tempfile.TemporaryDirectory(prefix="load_data_") as tmp:
+            exported = export_columnar_csv(csv_path, os.path.join(tmp, "customers.csv"))
+            return load_with_load_data(engine, exported, mode)
+    columns = read_csv_header(csv_path)
+    variables = [f"@v{i}" for i in range(len(columns))]
+    # Empty fields become NULL, matching what pandas writes for missing values
+    assignments = ", ".join(f"`{c}` = NULLIF({v}, '')" for c, v in zip(columns, variables))
+    # REPLACE swaps in the new row when `Customer Id` already exists
+    sql = (
+        "LOAD DATA LOCAL INFILE %s " + ("REPLACE " if mode == "upsert" else "")
+        + "INTO TABLE `customers` CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+        "LINES TERMINATED BY '\\n' IGNORE 1 LINES "
+        f"({', '.join(variables)}) SET {assignments}"
+    )
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(sql, (os.path.abspath(csv_path),))
+        raw.commit()
+        return cursor.rowcount, cursor.rowcount
+    finally:
+        raw.close()
+
+def csv_partitions(csv_path, parts):
+    """Split the data section of a CSV into ``parts`` byte ranges"""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        f.readline()
+        data_start = f.tell()
+    step = max(1, (size - data_start) // parts)
+    bounds = [data_start + i * step for i in range(parts)] + [size]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]]
+
+def read_csv_range(csv_path, start, end):
+    """Yield CSV records whose line starts inside [start, end)
+
+    Assumes no quoted field contains a newline, which holds for the
+    customers export format.
+    """
+    with open(csv_path, 'rb') as f:
+        # Step back one byte so a range starting exactly at a line start keeps that line
+        f.seek(start - 1)
+        f.readline()
+
+        def lines():
+            while f.tell() < end:
+                line = f.readline()
+                if not line:
+                    break
+                yield line.decode('utf-8')
+
+        yield from csv.reader(lines())
+
+# --- Columnar inputs (Parquet / Arrow IPC) ---
+INPUT_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+}
+
+def input_format(path):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported input file '{path}', expected one of {sorted(INPUT_FORMATS)}")
+    return INPUT_FORMATS[suffix]
+
+def import_pyarrow():
+    """pyarrow is only needed for columnar inputs, so it is imported on first use"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError as e:
+        raise RuntimeError("The 'pyarrow' package is required for Parquet/Arrow inputs") from e
+    return pyarrow, pyarrow.compute
+
+def open_ipc(path):
+    """Memory-map an Arrow IPC file (random access) or stream (sequential only)"""
+    pa, _ = import_pyarrow()
+    source = pa.memory_map(path)
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+def read_columnar_schema(path):
+    pa, _ = import_pyarrow()
+    if input_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path, memory_map=True)
+    return open_ipc(path).schema
+
+def columnar_units(path):
+    """Number of independently readable pieces: row groups or IPC record batches"""
+    if input_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path, memory_map=True).num_row_groups
+    reader = open_ipc(path)
+    return getattr(reader, "num_record_batches", 1)
+
+def columnar_partitions(path, parts):
+    """Split a columnar file into ``parts`` contiguous ranges of row groups / record batches"""
+    units = columnar_units(path)
+    step = max(1, -(-units // parts))
+    return [(start, min(start + step, units)) for start in range(0, units, step)]
+
+def iter_record_batches(path, batch_size, skip_rows=0, units=None):
+    """Yield record batches of at most ``batch_size`` rows from a memory-mapped file
+
+    Slicing a record batch is zero-copy, so re-batching and skipping already
+    committed rows never copy column data. ``units`` restricts reading to a
+    (start, end) range of row groups / record batches.
+    """
+    import_pyarrow()
+    if input_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path, memory_map=True)
+        groups = range(*units) if units else None
+        batches = parquet.iter_batches(batch_size=batch_size, row_groups=groups, use_threads=True)
+    else:
+        reader = open_ipc(path)
+        if hasattr(reader, "get_batch"):
+            batches = (reader.get_batch(i) for i in range(*(units or (0, reader.num_record_batches))))
+        else:
+            batches = iter(reader)
+
+    for batch in batches:
+        if skip_rows >= batch.num_rows:
+            skip_rows -= batch.num_rows
+            continue
+        if skip_rows:
+            batch = batch.slice(skip_rows)
+            skip_rows = 0
+        for offset in range(0, batch.num_rows, batch_size):
+            yield batch.slice(offset, batch_size)
+
+def normalize_batch(batch):
+    """Arrow-compute twin of normalize_chunk; already-typed columns pass through unchanged"""
+    pa, pc = import_pyarrow()
+    columns = []
+    for name, column in zip(batch.schema.names, batch.columns):
+        if pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.utf8_trim_whitespace(column)
+            column = pc.if_else(pc.equal(column, ""), pa.scalar(None, column.type), column)
+            if name == "Index":
+                numeric = pc.match_substring_regex(column, r"^-?\d+$")
+                column = pc.cast(pc.if_else(numeric, column, pa.scalar(None, column.type)), pa.int64())
+            elif name == "Email":
+                column = pc.utf8_lower(column)
+            elif name in ("Phone 1", "Phone 2"):
+                column = pc.replace_substring_regex(column, r"\s+", " ")
+            elif name == "Subscription Date":
+                column = pc.cast(
+                    pc.strptime(column, format="%Y-%m-%d", unit="s", error_is_null=True), pa.date32()
+                )
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+def batch_to_rows(batch):
+    """Record batch -> executemany rows, converting column by column rather than cell by cell"""
+    return list(zip(*(column.to_pylist() for column in batch.columns)))
+
+def stream_columnar_batches(path, batch_size, queue_size=4, skip_rows=0, units=None, rejects=None):
+    """Yield normalized row batches from a Parquet/Arrow file on a background thread"""
+    return pipelined(iter_record_batches(path, batch_size, skip_rows, units),
+                     lambda batch: prepare_batch(batch, rejects),
+                     queue_size=queue_size, name="arrow-reader")
+
+def customer_arrow_schema(columns):
+    """Typed schema used by convert_to_parquet: Index as int64, dates as date32, the rest text"""
+    pa, _ = import_pyarrow()
+    types = {"Index": pa.int64(), "Subscription Date": pa.date32()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+def convert_to_parquet(csv_path, parquet_path=None, batch_size=100000):
+    """One-shot CSV -> Parquet conversion so repeat loads skip text parsing
+
+    Rows are normalized on the way in and each chunk becomes one row group,
+    which is also the unit the parallel strategy splits on.
+    """
+    pa, _ = import_pyarrow()
+    import pyarrow.parquet as pq
+    parquet_path = parquet_path or os.path.splitext(csv_path)[0] + ".parquet"
+    schema = customer_arrow_schema(read_csv_header(csv_path))
+    rows = 0
+    with pq.ParquetWriter(parquet_path, schema, compression="zstd") as writer:
+        for chunk in read_csv_chunks(csv_path, batch_size):
+            df = normalize_chunk(chunk)
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+    logger.info(f"Converted {rows} rows from {csv_path} to {parquet_path}")
+    return parquet_path
+
+def export_columnar_csv(path, csv_path):
+    """Write a columnar file out as CSV for LOAD DATA, entirely inside Arrow"""
+    pa, _ = import_pyarrow()
+    import pyarrow.csv
+    batches = (normalize_batch(batch) for batch in iter_record_batches(path, 65536))
+    first = next(batches, None)
+    if first is None:
+        raise pd.errors.EmptyDataError(f"{path} contains no rows")
+    with pyarrow.csv.CSVWriter(csv_path, first.schema) as writer:
+        writer.write_batch(first)
+        for batch in batches:
+            writer.write_batch(batch)
+    return csv_path
+
+def read_input_header(path):
+    if input_format(path) == "csv":
+        return read_csv_header(path)
+    return read_columnar_schema(path).names
+
+def read_input_frame(path, nrows=None):
+    """Whole file (or its first ``nrows`` rows) as a DataFrame"""
+    if input_format(path) == "csv":
+        return pd.read_csv(path, nrows=nrows)
+    if nrows is None:
+        batches = iter_record_batches(path, 65536)
+    else:
+        batches = itertools.islice(iter_record_batches(path, nrows), 1)
+    # Normalized so untyped (all-text) files still produce the same column types as CSVs
+    batches = [normalize_batch(batch) for batch in batches]
+    if not batches:
+        raise pd.errors.EmptyDataError(f"{path} contains no rows")
+    pa, _ = import_pyarrow()
+    return pa.Table.from_batches(batches).to_pandas()
+
+def stream_input_batches(path, batch_size, queue_size=4, skip_rows=0, rejects=None):
+    if input_format(path) == "csv":
+        return stream_csv_batches(path, batch_size, queue_size, skip_rows, rejects=rejects)
+    return stream_columnar_batches(path, batch_size, queue_size, skip_rows, rejects=rejects)
+
+# --- Multi-file / multi-process ingest ---
+def expand_inputs(patterns):
+    """Resolve files, directories (their CSV/Parquet/Arrow files) and glob patterns to a sorted file list"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if os.path.splitext(name)[1].lower() in INPUT_FORMATS
+            )
+        elif glob.has_magic(pattern):
+            files.extend(glob.glob(pattern))
+        else:
+            files.append(pattern)
+    files = sorted(set(files))
+    if not files:
+        raise ValueError(f"No input files matched {patterns}")
+    missing = [f for f in files if not os.path.isfile(f)]
+    if missing:
+        raise FileNotFoundError(f"Input files not found: {missing}")
+    return files
+
+class ProgressReporter:
+    """Aggregates per-batch row counts from every worker and logs overall throughput"""
+
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.start = time.perf_counter()
+        self._last_log = self.start
+        self._lock = threading.Lock()
+
+    def add(self, rows_read, rows_written, rows_rejected=0):
+        with self._lock:
+            self.rows_read += rows_read
+            self.rows_written += rows_written
+            self.rows_rejected += rows_rejected
+            now = time.perf_counter()
+            if now - self._last_log >= self.interval:
+                self._last_log = now
+                self.log()
+
+    def log(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.rows_read / elapsed if elapsed else 0.0
+        logger.info(
+            f"Progress: {self.rows_read} rows read, {self.rows_written} written, "
+            f"{self.rows_rejected} rejected, {rate:.0f} rows/s"
+        )
+
+    def drain(self, progress_queue, stop):
+        """Thread target: consume (rows_read, rows_written, rows_rejected) messages from worker processes"""
+        while not (stop.is_set() and progress_queue.empty()):
+            try:
+                self.add(*progress_queue.get(timeout=0.2))
+            except queue.Empty:
+                continue
+
+# Set in each worker process by init_load_worker
+_connection_slots = None
+_progress_queue = None
+
+def init_load_worker(connection_slots, progress_queue):
+    global _connection_slots, _progress_queue
+    _connection_slots = connection_slots
+    _progress_queue = progress_queue
+
+def report_progress(rows_read, rows_written, rows_rejected=0):
+    _progress_queue.put((rows_read, rows_written, rows_rejected))
+
+def load_partition(config, csv_path, start, end, batch_size, mode="append", restart=False, rejects_dir=None):
+    """Process-pool worker: load one partition of one file over its own engine
+
+    A partition is a byte range of a CSV or a range of row groups / record
+    batches of a columnar file. Holds one of the global connection slots for
+    the duration of the task, and opens exactly one connection: the engine's
+    pool holds a single one, which the checkpoint read and the BatchWriter
+    take in turn.
+    """
+    columns = read_input_header(csv_path)
+    fingerprint = file_fingerprint(csv_path)
+    with _connection_slots:
+        engine = RDSConnectionManager().create_engine(config, pool_size=1, max_overflow=0)
+        try:
+            source = f"{os.path.abspath(csv_path)}#{start}-{end}"
+            committed, completed = (0, False) if restart else read_checkpoint(engine, source, fingerprint)
+            if completed:
+                return 0, 0
+            rejects = open_rejects(rejects_dir, csv_path, committed > 0, part=f"{start}-{end}")
+            if input_format(csv_path) == "csv":
+                records = itertools.islice(read_csv_range(csv_path, start, end), committed, None)
+                batches = (
+                    prepare_chunk(pd.DataFrame(chunk, columns=columns), rejects)
+                    for chunk in chunked(records, batch_size)
+                )
+            else:
+                batches = (
+                    prepare_batch(batch, rejects)
+                    for batch in iter_record_batches(csv_path, batch_size, committed, (start, end))
+                )
+            try:
+                return write_batches(engine, batches, columns, mode, (source, fingerprint), committed,
+                                     report_progress)
+            finally:
+                if rejects is not None:
+                    rejects.close()
+        finally:
+            engine.dispose()
+
+def load_in_parallel(config, inputs, batch_size, workers, mode="append", restart=False,
+                     max_connections=None, progress=None, rejects_dir=None):
+    """Fan partitions of every input file out across ``workers`` processes
+
+    Each file is split into enough ranges to keep all workers busy. At most
+    ``max_connections`` workers talk to the database at once, over one
+    connection each. Each range keeps its own checkpoint, so rerun with the
+    same worker count to resume.
+    """
+    parts_per_file = max(1, workers // len(inputs))
+    tasks = [
+        (csv_path, start, end)
+        for csv_path in inputs
+        for start, end in (
+            csv_partitions(csv_path, parts_per_file) if input_format(csv_path) == "csv"
+            else columnar_partitions(csv_path, parts_per_file)
+        )
+    ]
+    context = multiprocessing.get_context()
+    connection_slots = context.BoundedSemaphore(max_connections or workers)
+    progress_queue = context.Queue()
+    progress = progress or ProgressReporter()
+    stop = threading.Event()
+    drainer = threading.Thread(target=progress.drain, args=(progress_queue, stop), daemon=True)
+    drainer.start()
+
+    rows_read = rows_written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_load_worker,
+                                 initargs=(connection_slots, progress_queue)) as pool:
+            futures = [
+                pool.submit(load_partition, config, csv_path, start, end, batch_size, mode, restart, rejects_dir)
+                for csv_path, start, end in tasks
+            ]
+            for future in as_completed(futures):
+                read, written = future.result()
+                rows_read += read
+                rows_written += written
+    finally:
+        stop.set()
+        drainer.join()
+    return rows_read, rows_written
+
+def run_load(engine, config, inputs, strategy="executemany", batch_size=5000, workers=4, queue_size=4,
+             mode="append", restart=False, max_connections=None, rejects_dir=None):
+    """Load one or more input files into customers and return throughput stats
+
+    Pending schema migrations are applied first. Rows failing the shared
+    validation rules are written to CSV files under ``rejects_dir``; None
+    loads every row unchecked.
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    if strategy not in LOAD_STRATEGIES:
+        raise ValueError(f"Unknown load strategy '{strategy}', expected one of {LOAD_STRATEGIES}")
+    if mode != "append" and strategy == "to_sql":
+        raise ValueError("The to_sql strategy only supports append mode")
+
+    start = time.perf_counter()
+    progress = ProgressReporter()
+    migrate(engine)
+    if strategy in ("executemany", "parallel"):
+        ensure_load_tables(engine)
+
+    rows = rows_written = 0
+    if strategy == "parallel":
+        rows, rows_written = load_in_parallel(
+            config, inputs, batch_size, workers, mode, restart, max_connections, progress, rejects_dir
+        )
+    else:
+        for csv_path in inputs:
+            if strategy == "to_sql":
+                read, written = load_with_to_sql(engine, csv_path, batch_size, rejects_dir)
+                progress.add(read, written, read - written)
+            elif strategy == "executemany":
+                read, written = load_with_executemany(
+                    engine, csv_path, batch_size, queue_size, mode, restart, progress.add, rejects_dir
+                )
+            else:
+                if rejects_dir is not None:
+                    logger.warning("The load_data strategy is parsed by the server; rows are not validated")
+                read, written = load_with_load_data(engine, csv_path, mode)
+            rows += read
+            rows_written += written
+    seconds = time.perf_counter() - start
+
+    stats = {
+        "strategy": strategy,
+        "mode": mode,
+        "files": len(inputs),
+        "rows": rows,
+        "rows_written": rows_written,
+        "rows_rejected": progress.rows_rejected,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    logger.info(f"Load stats: {json.dumps(stats)}")
+    return stats
+
+def load_data_to_rds(inputs=('customers-10000.csv',), strategy='executemany', batch_size=5000, workers=4,
+                     queue_size=4, mode='append', restart=False, max_connections=None, rejects_dir='rejects'):
     """Main data loading function with comprehensive error handling"""
     try:
         manager = RDSConnectionManager()
@@ -273,22 +1168,16 @@ def load_data_to_rds():
         logger.info("RDS configuration validated")
         
         # 2. Establish connection
-        engine = manager.create_engine(config)
+        engine = manager.create_engine(config, local_infile=strategy == "load_data")
         
-        # 3. Load and transform data
-        df = pd.read_csv('customers-10000.csv')
-        logger.info(f"Loaded {len(df)} records from CSV")
-        
-        # 4. Write to database
-        df.to_sql(
-            name='customers',
-            con=engine,
-            if_exists='append',
-            index=False,
-            chunksize=1000,
-            method='multi'
+        # 3. Load data with the selected strategy
+        files = expand_inputs(inputs)
+        stats = run_load(
+            engine, config, files, strategy, batch_size, workers, queue_size, mode, restart, max_connections,
+            rejects_dir
         )
-        
+        logger.info(f"Loaded {stats['rows']} records from {len(files)} file(s)")
+
         logger.info("Data successfully loaded to RDS")
         return True
         
@@ -302,10 +1191,55 @@ def load_data_to_rds():
         
     return False
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load customer CSV data into RDS")
+    parser.add_argument("--input", "--csv", dest="inputs", nargs="+",
+                        default=os.getenv("LOAD_INPUTS", "customers-10000.csv").split(","),
+                        help="CSV, Parquet or Arrow IPC files, directories or glob patterns to load")
+    parser.add_argument("--strategy", choices=LOAD_STRATEGIES, default=os.getenv("LOAD_STRATEGY", "executemany"))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("LOAD_BATCH_SIZE", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LOAD_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--queue-size", type=int, default=int(os.getenv("LOAD_QUEUE_SIZE", "4")),
+                        help="Chunks buffered between pipeline stages")
+    parser.add_argument("--mode", choices=LOAD_MODES, default=os.getenv("LOAD_MODE", "append"),
+                        help="append rows, upsert by Customer Id, or upsert only changed rows")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore checkpoints from earlier runs of the same file")
+    parser.add_argument("--max-connections", type=int,
+                        default=int(os.getenv("LOAD_MAX_CONNECTIONS", "0")) or None,
+                        help="Cap on concurrent DB connections across parallel workers (default: --workers)")
+    parser.add_argument("--rejects-dir", default=os.getenv("LOAD_REJECTS_DIR", "rejects"),
+                        help="Where rows failing validation are written, one CSV per input file")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Load rows without validating them")
+    parser.add_argument("--convert-to-parquet", action="store_true",
+                        help="Convert the CSV inputs to Parquet next to the source files and exit")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Apply pending schema migrations (see schema.py) and exit")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
     try:
-        success = load_data_to_rds()
+        args = parse_args()
+        if args.migrate:
+            manager = RDSConnectionManager()
+            engine = manager.create_engine(manager.get_rds_config())
+            try:
+                applied = migrate(engine)
+                logger.info(f"Applied {len(applied)} schema migration(s)")
+            finally:
+                engine.dispose()
+            sys.exit(0)
+        if args.convert_to_parquet:
+            for path in expand_inputs(args.inputs):
+                if input_format(path) == "csv":
+                    convert_to_parquet(path, batch_size=max(args.batch_size, 100000))
+            sys.exit(0)
+        success = load_data_to_rds(
+            args.inputs, args.strategy, args.batch_size, args.workers, args.queue_size, args.mode,
+            args.restart, args.max_connections, None if args.no_validate else args.rejects_dir
+        )
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         logger.info("Process interrupted by user")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,214 @@
+"""
+Versioned schema for the customers table.
+
+    python scripts/load_to_rds.py --migrate
+
+Migrations run once each, in order, and are recorded in schema_migrations.
+The loader applies pending ones before every load. Append new steps to
+MIGRATIONS; never edit or reorder one that has shipped. MySQL commits DDL
+immediately, so every step checks what already exists and can be rerun
+after a failure.
+"""
+import logging
+import os
+import sys
+import time
+
+from sqlalchemy import inspect, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "customer-app"))
+import validation
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+CUSTOMER_KEY = "Customer Id"
+
+def string_type(column, default_length=255):
+    """VARCHAR as wide as the loader's validation rule for ``column`` allows"""
+    rule = validation.CUSTOMER_RULES.get(column)
+    return f"VARCHAR({rule.max_length if rule else default_length})"
+
+# Input columns in file order -> SQL type
+CUSTOMER_COLUMNS = {
+    "Index": "BIGINT NOT NULL",
+    "Customer Id": string_type("Customer Id") + " NOT NULL",
+    "First Name": string_type("First Name"),
+    "Last Name": string_type("Last Name"),
+    "Company": string_type("Company"),
+    "City": string_type("City"),
+    "Country": string_type("Country"),
+    "Phone 1": string_type("Phone 1"),
+    "Phone 2": string_type("Phone 2"),
+    "Email": string_type("Email"),
+    "Subscription Date": "DATE",
+    "Website": string_type("Website"),
+}
+
+# `Index` backs the keyset listing; the rest back /search, one per prefix
+# filter (SEARCH_PREFIX_COLUMNS in customer-app/backend.py) plus the date range.
+# Lookups by `Customer Id` use the primary key.
+SECONDARY_INDEXES = {
+    "idx_customers_index": "Index",
+    "idx_customers_first_name": "First Name",
+    "idx_customers_last_name": "Last Name",
+    "idx_customers_company": "Company",
+    "idx_customers_city": "City",
+    "idx_customers_country": "Country",
+    "idx_customers_email": "Email",
+    "idx_customers_subscription_date": "Subscription Date",
+}
+# SQLite's LIKE ignores case, so it only uses an index built with NOCASE for a prefix match
+PREFIX_INDEXES = {
+    "idx_customers_first_name", "idx_customers_last_name", "idx_customers_company",
+    "idx_customers_city", "idx_customers_country", "idx_customers_email",
+}
+# MySQL only; the column list must match FULLTEXT_COLUMNS in customer-app/backend.py
+FULLTEXT_INDEXES = {
+    "ftx_customers_search": ["First Name", "Last Name", "Company", "City", "Country", "Email"],
+}
+
+# --- Building blocks, also used by the benchmarks on their own tables ---
+def create_customers_table(conn, table="customers"):
+    """Create ``table`` with typed columns, keyed by `Customer Id`"""
+    columns = [f"`{name}` {kind}" for name, kind in CUSTOMER_COLUMNS.items()]
+    if conn.dialect.name == "mysql":
+        columns.append("updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+    else:
+        columns.append("updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+    columns.append(f"PRIMARY KEY (`{CUSTOMER_KEY}`)")
+    options = " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4" if conn.dialect.name == "mysql" else ""
+    conn.execute(text(f"CREATE TABLE `{table}` ({', '.join(columns)}){options}"))
+    if conn.dialect.name != "mysql":
+        create_updated_at_triggers(conn, table)
+
+def create_updated_at_triggers(conn, table="customers"):
+    """SQLite has no ON UPDATE CURRENT_TIMESTAMP; triggers keep `updated_at` current instead"""
+    # The UPDATE trigger skips statements that set updated_at themselves, so it cannot recurse
+    triggers = {
+        "insert": "AFTER INSERT",
+        "update": "AFTER UPDATE",
+    }
+    for name, event in triggers.items():
+        conn.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS "{table}_updated_at_{name}" {event} ON "{table}" '
+            "FOR EACH ROW WHEN NEW.updated_at IS NULL"
+            + (" OR NEW.updated_at IS OLD.updated_at" if name == "update" else "")
+            + f' BEGIN UPDATE "{table}" SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END'
+        ))
+
+def create_customer_indexes(conn, table="customers"):
+    """Create the secondary and FULLTEXT indexes ``table`` is missing; returns their names"""
+    existing = {index["name"] for index in inspect(conn).get_indexes(table)}
+    created = []
+    for name, column in SECONDARY_INDEXES.items():
+        if name in existing:
+            continue
+        collation = " COLLATE NOCASE" if name in PREFIX_INDEXES and conn.dialect.name == "sqlite" else ""
+        logger.info(f"Creating index {name} on {table}")
+        conn.execute(text(f"CREATE INDEX {name} ON `{table}` (`{column}`{collation})"))
+        created.append(name)
+    if conn.dialect.name == "mysql":
+        for name, columns in FULLTEXT_INDEXES.items():
+            if name in existing:
+                continue
+            logger.info(f"Creating index {name} on {table}")
+            conn.execute(text(
+                f"CREATE FULLTEXT INDEX {name} ON `{table}` ({', '.join(f'`{c}`' for c in columns)})"
+            ))
+            created.append(name)
+    return created
+
+# --- Migrations ---
+def create_customers(conn):
+    if not inspect(conn).has_table("customers"):
+        create_customers_table(conn)
+
+def type_legacy_customers(conn):
+    """Rebuild a table pandas created (TEXT columns, no key) with typed columns and a primary key
+
+    Keeps the first row per `Customer Id` in `Index` order, which drops the
+    duplicates left by rerunning append loads. Subscription dates that are
+    not valid ISO dates become NULL.
+    """
+    if inspect(conn).get_pk_constraint("customers")["constrained_columns"]:
+        return
+    existing = {column["name"] for column in inspect(conn).get_columns("customers")}
+    columns = [c for c in list(CUSTOMER_COLUMNS) + ["updated_at"] if c in existing]
+    mysql = conn.dialect.name == "mysql"
+    values = []
+    for column in columns:
+        if column != "Subscription Date":
+            values.append(f"`{column}`")
+        elif mysql:
+            # NULL, with a warning that INSERT IGNORE tolerates, for anything that is not a date
+            values.append("STR_TO_DATE(`Subscription Date`, '%Y-%m-%d')")
+        else:
+            # The modifier makes date() roll impossible days over, e.g. 02-30 to 03-02
+            values.append(
+                "CASE WHEN date(`Subscription Date`, '+0 days') = `Subscription Date` THEN `Subscription Date` END"
+            )
+
+    total = conn.execute(text("SELECT COUNT(*) FROM customers")).scalar()
+    logger.info(f"Rebuilding customers ({total} rows) with typed columns and a primary key")
+    conn.execute(text("DROP TABLE IF EXISTS customers_typed"))  # left by an interrupted rebuild
+    create_customers_table(conn, "customers_typed")
+    conn.execute(text(
+        f"INSERT {'IGNORE' if mysql else 'OR IGNORE'} INTO customers_typed "
+        f"({', '.join(f'`{c}`' for c in columns)}) "
+        f"SELECT {', '.join(values)} FROM customers "
+        f"WHERE `{CUSTOMER_KEY}` IS NOT NULL ORDER BY `Index`"
+    ))
+    kept = conn.execute(text("SELECT COUNT(*) FROM customers_typed")).scalar()
+    if kept < total:
+        logger.warning(f"Dropped {total - kept} duplicate or keyless customer rows")
+    if mysql:
+        conn.execute(text("RENAME TABLE customers TO customers_legacy, customers_typed TO customers"))
+        conn.execute(text("DROP TABLE customers_legacy"))
+    else:
+        # Dropping the old table also drops its triggers; recreate them on the new one
+        conn.execute(text("DROP TABLE customers"))
+        conn.execute(text("ALTER TABLE customers_typed RENAME TO customers"))
+        for name in ("insert", "update"):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS "customers_typed_updated_at_{name}"'))
+        create_updated_at_triggers(conn)
+
+def add_customer_indexes(conn):
+    create_customer_indexes(conn)
+
+# (version, name, step); each step receives one connection inside a transaction
+MIGRATIONS = [
+    (1, "create_customers", create_customers),
+    (2, "type_legacy_customers", type_legacy_customers),
+    (3, "add_customer_indexes", add_customer_indexes),
+]
+
+def applied_migrations(engine):
+    """Versions already applied, creating the bookkeeping table on first use"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER NOT NULL PRIMARY KEY, "
+            "name VARCHAR(100) NOT NULL, "
+            "applied_at VARCHAR(32))"
+        ))
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+def migrate(engine):
+    """Apply pending migrations in order; returns the versions applied"""
+    applied = applied_migrations(engine)
+    done = []
+    for version, name, step in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying schema migration {version} ({name})")
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {"version": version, "name": name, "applied_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            )
+        done.append(version)
+    if done:
+        logger.info(f"Schema is at version {MIGRATIONS[-1][0]}")
+    return done
@@ -0,0 +1,65 @@
+import csv
+import itertools
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+APP_DIR = os.path.join(ROOT, "customer-app")
+sys.path[:0] = [APP_DIR, os.path.join(ROOT, "scripts"), os.path.join(ROOT, "benchmarks")]
+
+from sqlalchemy import create_engine
+
+from schema import CUSTOMER_COLUMNS, migrate
+
+SOURCE_CSV = os.path.join(ROOT, "customers-10000.csv")
+ROWS = 2000
+ADMIN = ("admin", "test-password")
+
+
+@pytest.fixture(scope="session")
+def customers_db(tmp_path_factory):
+    """SQLite file migrated by scripts/schema.py and holding the first ROWS sample customers"""
+    path = str(tmp_path_factory.mktemp("db") / "customers.db")
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine)
+    engine.dispose()
+    with open(SOURCE_CSV, newline="", encoding="utf-8") as f:
+        rows = [[row[column] for column in CUSTOMER_COLUMNS] for row in itertools.islice(csv.DictReader(f), ROWS)]
+    conn = sqlite3.connect(path)
+    try:
+        columns = ", ".join(f"`{column}`" for column in CUSTOMER_COLUMNS)
+        conn.executemany(
+            f"INSERT INTO customers ({columns}) VALUES ({', '.join('?' * len(CUSTOMER_COLUMNS))})", rows
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def backend(customers_db):
+    """customer-app/backend.py imported against customers_db, with the rate limits off"""
+    os.environ.update({
+        "DB_DRIVER": "sqlite",
+        "DB_SQLITE_PATH": customers_db,
+        "ADMIN_PASSWORD": ADMIN[1],
+        "SESSION_SECRET": "test-secret",
+        "RATE_LIMIT_PER_SECOND": "0",
+        "LOGIN_ATTEMPTS_PER_MINUTE": "0",
+    })
+    import backend
+    return backend
+
+
+@pytest.fixture
+def client(backend, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.chdir(APP_DIR)  # templates are looked up relative to the app
+    with TestClient(backend.app) as client:
+        yield client
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionControl, ForwardedClientMiddleware, TokenBuckets
+from auth import PasswordVerifier, TooManyAttempts
+
+
+def test_route_rejections_do_not_use_up_the_client_budget():
+    control = AdmissionControl(clients=TokenBuckets(0.001, 3), routes={"/export.csv": TokenBuckets(0.001, 1)})
+    assert control.rate_limited("10.0.0.1", "/export.csv") == 0
+    for _ in range(5):
+        assert control.rate_limited("10.0.0.1", "/export.csv") > 0
+    # One token spent on the export; the refused retries cost nothing
+    assert control.rate_limited("10.0.0.1", "/") == 0
+    assert control.rate_limited("10.0.0.1", "/") == 0
+    assert control.rate_limited("10.0.0.1", "/") > 0
+    assert control.shed == {"client_rate": 1, "route_rate": 5, "overload": 0}
+
+
+def test_client_rejections_give_back_the_route_token():
+    control = AdmissionControl(clients=TokenBuckets(0.001, 1), routes={"/search": TokenBuckets(0.001, 2)})
+    assert control.rate_limited("10.0.0.1", "/") == 0
+    assert control.rate_limited("10.0.0.1", "/search") > 0
+    # Another client's budget is untouched, and the first still has both search tokens
+    assert control.rate_limited("10.0.0.2", "/search") == 0
+    assert control.routes["/search"]._buckets["10.0.0.1"][0] >= 2 - 1e-3
+
+
+def forwarded_client(trusted, peer, forwarded_for=None):
+    """The client address the app sees behind ForwardedClientMiddleware"""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["client"] = scope["client"][0]
+
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    scope = {"type": "http", "headers": headers, "client": (peer, 50000)}
+    asyncio.run(ForwardedClientMiddleware(app, trusted=trusted)(scope, None, None))
+    return seen["client"]
+
+
+def test_client_address_comes_from_trusted_load_balancers_only():
+    trusted = ["10.0.0.0/16", "127.0.0.1"]
+    # The ELB appends the address it saw; whatever the client sent itself is ignored
+    assert forwarded_client(trusted, "10.0.3.7", "6.6.6.6, 203.0.113.9") == "203.0.113.9"
+    assert forwarded_client(trusted, "10.0.3.7", "203.0.113.9, 10.0.1.2") == "203.0.113.9"
+    assert forwarded_client(trusted, "10.0.3.7") == "10.0.3.7"
+    # Anyone else cannot claim an address
+    assert forwarded_client(trusted, "198.51.100.4", "203.0.113.9") == "198.51.100.4"
+    assert forwarded_client([], "10.0.3.7", "203.0.113.9") == "10.0.3.7"
+
+
+def test_login_throttle_is_per_username_and_client():
+    async def scenario():
+        verifier = PasswordVerifier(cache_ttl=0, attempts=TokenBuckets(0.001, 2))
+        try:
+            for _ in range(2):
+                assert not await verifier.verify("admin", "wrong", "right", client="6.6.6.6")
+            with pytest.raises(TooManyAttempts):
+                await verifier.verify("admin", "wrong", "right", client="6.6.6.6")
+            # The admin elsewhere can still log in, and the guesser's other accounts are not affected
+            assert await verifier.verify("admin", "right", "right", client="203.0.113.9")
+            assert not await verifier.verify("other", "wrong", "right", client="6.6.6.6")
+        finally:
+            verifier.close()
+
+    asyncio.run(scenario())
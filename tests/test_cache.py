@@ -0,0 +1,101 @@
+import asyncio
+from datetime import date, datetime
+
+from cache import CustomerCache, DataVersion, InMemoryBackend
+
+
+class RecordingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.gets = []
+
+    async def get(self, key):
+        self.gets.append(key)
+        return await super().get(key)
+
+
+def replica(backend):
+    """A CustomerCache set up like backend.py's on one replica"""
+    return CustomerCache(backend=backend, version=DataVersion(backend=backend, ttl=0))
+
+
+def loader(row, calls):
+    async def load():
+        calls.append(row)
+        return row
+    return load
+
+
+def test_lookups_are_served_locally_once_loaded():
+    async def scenario():
+        backend = RecordingBackend()
+        cache = replica(backend)
+        calls = []
+        assert await cache.get_or_load("A1", loader({"Customer Id": "A1"}, calls)) == {"Customer Id": "A1"}
+        backend.gets.clear()
+        assert await cache.get_or_load("A1", loader({"Customer Id": "A1"}, calls)) == {"Customer Id": "A1"}
+        assert calls == [{"Customer Id": "A1"}]
+        # Only the data version was read; the row came from the local LRU
+        assert "customer:A1" not in backend.gets
+        assert cache.local.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_is_seen_by_another_replica():
+    async def scenario():
+        backend = InMemoryBackend()
+        first, second = replica(backend), replica(backend)
+        calls = []
+        await first.get_or_load("A1", loader({"First Name": "Old"}, calls))
+        # The second replica finds the row in the backend and keeps a local copy
+        assert await second.get_or_load("A1", loader({"First Name": "Unused"}, calls)) == {"First Name": "Old"}
+        assert await second.get_or_load("A1", loader({"First Name": "Unused"}, calls)) == {"First Name": "Old"}
+        assert second.backend_hits == 1 and second.local.hits == 1
+
+        # What backend.customer_changed() does on the first replica
+        await first.invalidate("A1")
+        await first.version.bump()
+
+        assert await second.get_or_load("A1", loader({"First Name": "New"}, calls)) == {"First Name": "New"}
+        assert await first.get_or_load("A1", loader({"First Name": "Unused"}, calls)) == {"First Name": "New"}
+        assert calls == [{"First Name": "Old"}, {"First Name": "New"}]
+
+    asyncio.run(scenario())
+
+
+def test_a_load_racing_another_replicas_write_is_not_shared():
+    async def scenario():
+        backend = InMemoryBackend()
+        first, second = replica(backend), replica(backend)
+
+        async def load_across_write():
+            # The first replica writes while the second is still reading the old row
+            await first.invalidate("A1")
+            await first.version.bump()
+            return {"First Name": "Old"}
+
+        await second.get_or_load("A1", load_across_write)
+        calls = []
+        assert await first.get_or_load("A1", loader({"First Name": "New"}, calls)) == {"First Name": "New"}
+        assert calls == [{"First Name": "New"}]
+
+    asyncio.run(scenario())
+
+
+def test_rows_from_the_backend_keep_their_types():
+    async def scenario():
+        backend = InMemoryBackend()
+        first, second = replica(backend), replica(backend)
+        row = {
+            "Customer Id": "A1",
+            "Subscription Date": date(2021, 3, 4),
+            "updated_at": datetime(2024, 5, 6, 7, 8, 9),
+        }
+        await first.get_or_load("A1", loader(row, []))
+        shared = await second.get_or_load("A1", loader(None, []))
+        assert second.backend_hits == 1
+        assert shared == row
+        assert type(shared["Subscription Date"]) is date and type(shared["updated_at"]) is datetime
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+import itertools
+import queue
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+import load_to_rds
+from conftest import SOURCE_CSV
+
+
+def test_partition_load_opens_one_connection(tmp_path, request, monkeypatch):
+    csv_path = tmp_path / "customers.csv"
+    with open(SOURCE_CSV, encoding="utf-8") as f:
+        csv_path.write_text("".join(itertools.islice(f, 301)), encoding="utf-8")
+    config = {"url": f"sqlite:///{tmp_path / 'load.db'}"}
+
+    setup = load_to_rds.RDSConnectionManager().create_engine(config)
+    load_to_rds.migrate(setup)
+    load_to_rds.ensure_load_tables(setup)
+    setup.dispose()
+
+    connects = []
+    count = lambda *_: connects.append(1)
+    event.listen(Pool, "connect", count)
+    request.addfinalizer(lambda: event.remove(Pool, "connect", count))
+    engines = []
+    create_engine = load_to_rds.RDSConnectionManager.create_engine
+
+    def recording_create_engine(self, *args, **kwargs):
+        engines.append(create_engine(self, *args, **kwargs))
+        return engines[-1]
+
+    monkeypatch.setattr(load_to_rds.RDSConnectionManager, "create_engine", recording_create_engine)
+    load_to_rds.init_load_worker(threading.BoundedSemaphore(1), queue.Queue())
+    [(start, end)] = load_to_rds.csv_partitions(str(csv_path), 1)
+    assert load_to_rds.load_partition(config, str(csv_path), start, end, batch_size=100) == (300, 300)
+    # The connection check, the checkpoint read and the batch writes share one connection
+    assert len(connects) == 1
+    # and the pool cannot open a second one, whatever checks out connections
+    [engine] = engines
+    assert engine.pool.size() == 1 and engine.pool._max_overflow == 0
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from conftest import ADMIN
+
+
+def test_stats_are_for_admins_only(client):
+    assert client.get("/stats").status_code == 401
+    assert client.get("/stats", auth=("admin", "wrong")).status_code == 401
+    response = client.get("/stats", auth=ADMIN)
+    assert response.status_code == 200
+    assert "pool" in response.json()
+
+
+def test_metrics_are_only_served_on_the_metrics_port(backend, client):
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Host": f"testserver:{backend.METRICS_PORT}"}).status_code == 404
+
+    internal = TestClient(backend.app, base_url=f"http://testserver:{backend.METRICS_PORT}")
+    response = internal.get("/metrics")
+    assert response.status_code == 200
+    assert "cache_hits_total" in response.text
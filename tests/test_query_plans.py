@@ -0,0 +1,24 @@
+import shutil
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def check_query_plans(backend):
+    # Imported once backend.py can be, i.e. with the SQLite settings in place
+    import check_query_plans
+    return check_query_plans
+
+
+def test_migrated_schema_serves_hot_queries_from_indexes(check_query_plans, customers_db):
+    assert check_query_plans.check(f"sqlite:///{customers_db}") == []
+
+
+def test_a_missing_index_is_reported(check_query_plans, customers_db, tmp_path):
+    path = tmp_path / "customers.db"
+    shutil.copy(customers_db, path)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX idx_customers_email")
+    conn.close()
+    assert check_query_plans.check(f"sqlite:///{path}") == ["search_email"]
@@ -0,0 +1,127 @@
+import contextvars
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from mysql.connector import errors
+
+from db import PrimaryReadsMiddleware, SQLiteConnection, SQLiteCursor, reading_from_primary
+
+SELECT = "SELECT `Customer Id` FROM customers ORDER BY `Index` LIMIT 50"
+
+
+class FlakyCursor(SQLiteCursor):
+    """Fails every fetch once the connection's ``fetches_left`` has run out"""
+
+    def __init__(self, cursor, dictionary, conn):
+        super().__init__(cursor, dictionary)
+        self.conn = conn
+
+    def _fetch(self):
+        if self.conn.fetches_left is not None:
+            if self.conn.fetches_left <= 0:
+                raise errors.OperationalError("Lost connection to MySQL server during query")
+            self.conn.fetches_left -= 1
+
+    def fetchall(self):
+        self._fetch()
+        return super().fetchall()
+
+    def fetchmany(self, size):
+        self._fetch()
+        return super().fetchmany(size)
+
+
+class FlakyConnection(SQLiteConnection):
+    fetches_left = None  # unlimited
+
+    def cursor(self, dictionary=False, buffered=True):
+        return FlakyCursor(self._conn.cursor(), dictionary, type(self))
+
+
+@pytest.fixture
+def replica(backend, customers_db, monkeypatch):
+    """One read replica: the same SQLite file through a pool of its own"""
+    connect = backend.connect
+    monkeypatch.setattr(backend, "DB_REPLICA_HOSTS", [customers_db])
+    monkeypatch.setattr(backend, "DB_REPLICA_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(backend, "connect", lambda host=None: FlakyConnection(host) if host else connect())
+    monkeypatch.setattr(FlakyConnection, "fetches_left", None)
+
+
+def replica_stats(backend):
+    [stats] = backend.replicas.stats()["replicas"]
+    return stats
+
+
+def test_reads_go_to_a_healthy_replica(backend, replica, client):
+    reads = replica_stats(backend)["reads"]
+    assert client.get("/api/v1/customers", params={"page_size": 1}).status_code == 200
+    assert replica_stats(backend)["reads"] > reads
+    assert backend.replicas.fallbacks == 0
+
+
+def test_reads_fall_back_to_the_primary_when_every_replica_is_down(backend, replica, client):
+    [pool] = backend.replicas.pools
+    backend.replicas.mark_down(pool, "down for the test")
+    reads = replica_stats(backend)["reads"]
+    assert client.get("/api/v1/customers", params={"page_size": 1}).status_code == 200
+    assert replica_stats(backend)["reads"] == reads
+    assert backend.replicas.fallbacks > 0
+
+
+async def fetch_rows(database):
+    return await database.fetch_all(SELECT)
+
+
+async def stream_rows(database):
+    return [row async for batch in database.stream(SELECT, batch_size=10) for row in batch]
+
+
+@pytest.mark.parametrize("read, fetches", [(fetch_rows, 0), (stream_rows, 1)])
+def test_replica_is_marked_down_after_a_read_error(backend, replica, client, monkeypatch, read, fetches):
+    # The stream gets its first batch before the replica goes away
+    monkeypatch.setattr(FlakyConnection, "fetches_left", fetches)
+    with pytest.raises(HTTPException) as raised:
+        client.portal.call(read, backend.database)
+    assert raised.value.status_code == 503
+    assert not replica_stats(backend)["healthy"]
+    assert "Lost connection" in replica_stats(backend)["last_error"]
+
+    # Later reads skip it
+    monkeypatch.setattr(FlakyConnection, "fetches_left", None)
+    reads = replica_stats(backend)["reads"]
+    assert len(client.portal.call(read, backend.database)) == 50
+    assert replica_stats(backend)["reads"] == reads
+
+
+def test_writes_pin_the_session_to_the_primary(backend, replica, client):
+    request = SimpleNamespace(session={})
+
+    def write():
+        backend.pin_reads_to_primary(request)
+        return reading_from_primary()
+
+    # The rest of the writing request reads from the primary too
+    assert contextvars.copy_context().run(write)
+    deadline = request.session[backend.PRIMARY_READS_KEY]
+    assert time.time() < deadline <= time.time() + backend.READ_YOUR_WRITES_SECONDS
+
+    async def handler(scope, receive, send):
+        scope["pinned"] = reading_from_primary()
+        await backend.database.fetch_all(SELECT)
+
+    middleware = PrimaryReadsMiddleware(handler, session_key=backend.PRIMARY_READS_KEY)
+
+    def request_with(session):
+        scope = {"type": "http", "session": session}
+        reads = replica_stats(backend)["reads"]
+        client.portal.call(middleware, scope, None, None)
+        return scope["pinned"], replica_stats(backend)["reads"] > reads
+
+    # The session's next requests read from the primary until the deadline, then from the replica again
+    assert request_with(request.session) == (True, False)
+    assert request_with({backend.PRIMARY_READS_KEY: time.time() - 1}) == (False, True)
+    assert request_with({}) == (False, True)
+    assert not reading_from_primary()
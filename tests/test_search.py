@@ -0,0 +1,10 @@
+def test_fulltext_search_falls_back_to_prefix_without_the_index(client):
+    # SQLite has no FULLTEXT index, so mode=fulltext searches by prefix instead of failing
+    fulltext = client.get("/api/v1/customers/search", params={"q": "Ki", "mode": "fulltext"})
+    prefix = client.get("/api/v1/customers/search", params={"q": "Ki", "mode": "prefix"})
+    assert fulltext.status_code == 200
+    assert fulltext.json() == prefix.json()
+    assert fulltext.json()["items"]
+
+    page = client.get("/search", params={"q": "Ki", "mode": "fulltext"})
+    assert page.status_code == 200
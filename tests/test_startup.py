@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from mysql.connector import errors
+
+
+@pytest.fixture
+def database_down(backend, monkeypatch):
+    """Connections fail until the returned switch is flipped"""
+    up = []
+    connect = backend.connect
+
+    def unreachable_until_up(host=None):
+        if not up:
+            raise errors.InterfaceError("Can't connect to MySQL server")
+        return connect(host)
+
+    monkeypatch.setattr(backend, "connect", unreachable_until_up)
+    monkeypatch.setattr(backend, "has_updated_at", False)
+    monkeypatch.setattr(backend, "schema_detected", False)
+    return lambda: up.append(True)
+
+
+def test_app_starts_unready_without_its_database(backend, database_down, client, monkeypatch):
+    assert client.get("/health").status_code == 200
+    assert client.get("/ready").status_code == 503
+    assert not backend.schema_detected
+    with monkeypatch.context() as m:
+        m.setattr(backend, "DB_DRIVER", "mysql")
+        assert backend.detect_fulltext() is None
+
+    database_down()
+    # The first readiness check that reaches the database detects the schema
+    assert client.get("/ready").status_code == 200
+    assert backend.schema_detected and backend.has_updated_at
+
+
+@pytest.fixture
+def fulltext_index(backend, monkeypatch):
+    """Stands in for the FULLTEXT index, which SQLite lacks; created by calling the result"""
+    created = []
+    monkeypatch.setattr(backend, "detect_fulltext", lambda: bool(created))
+    monkeypatch.setattr(backend, "has_fulltext", False)
+    monkeypatch.setattr(backend, "SCHEMA_CHECK_INTERVAL", 0.05)
+    return lambda: created.append(True)
+
+
+def test_fulltext_index_is_picked_up_after_startup(backend, fulltext_index, client):
+    assert not backend.has_fulltext
+    fulltext_index()  # migration 3 runs while the app is up
+    for _ in range(40):
+        if backend.has_fulltext:
+            break
+        time.sleep(0.05)
+    assert backend.has_fulltext
@@ -0,0 +1,83 @@
+import asyncio
+import base64
+import time
+
+import pytest
+
+from conftest import ADMIN
+from db import AsyncDatabase
+
+
+async def disconnect_mid_stream(app, path):
+    """Request ``path`` as an admin and hang up after the first body chunk; returns the status"""
+    credentials = base64.b64encode(":".join(ADMIN).encode()).decode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Basic {credentials}".encode())],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    first_chunk = asyncio.Event()
+    requested = False
+    status = None
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            first_chunk.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def wait_until_idle(pool, timeout=5.0):
+    for _ in range(int(timeout / 0.05)):
+        if pool.stats()["in_use"] == 0:
+            return
+        await asyncio.sleep(0.05)
+
+
+@pytest.fixture
+def single_connection(backend, monkeypatch):
+    """One connection and slow, small batches, so the client leaves while a fetch is running"""
+    def slow_query(fn, *args):
+        time.sleep(0.05)
+        return fn(*args)
+
+    monkeypatch.setattr(AsyncDatabase, "_timed_query", staticmethod(slow_query))
+    monkeypatch.setitem(backend.pool_config, "pool_size", 1)
+    monkeypatch.setitem(backend.pool_config, "max_overflow", 0)
+    monkeypatch.setitem(backend.pool_config, "timeout", 2)
+    # Sized like the pool, as in production: cleanup queues behind the fetch it interrupted
+    monkeypatch.setattr(backend, "db_executor_workers", 1)
+    monkeypatch.setattr(backend, "EXPORT_BATCH_SIZE", 10)
+    # Keep every checkout alive: CPython would otherwise give back a leaked connection
+    # when the abandoned checkout is collected, which hides the leak whenever nothing
+    # else happens to hold a reference to it
+    checkouts = []
+    read_connection = backend.get_read_connection
+
+    def kept_read_connection():
+        checkouts.append(read_connection())
+        return checkouts[-1]
+
+    monkeypatch.setattr(backend, "get_read_connection", kept_read_connection)
+
+
+@pytest.mark.parametrize("path", ["/export.csv", "/export.ndjson", "/stream"])
+def test_disconnect_mid_stream_returns_connection(backend, single_connection, client, path):
+    assert client.portal.call(disconnect_mid_stream, backend.app, path) == 200
+    client.portal.call(wait_until_idle, backend.db_pool)
+    assert backend.db_pool.stats()["in_use"] == 0
+    # The pool's only connection is usable again
+    assert client.get("/api/v1/customers", params={"page_size": 1}).status_code == 200